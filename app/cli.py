@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Yönetim komutları:  python -m app.cli <komut>
+
+import argparse
+import asyncio
+import sys
+
+from app.db.database import Base, SessionLocal, engine
+from app.models import user, mood, mood_rollup, presentation  # noqa: F401  (tablolar kayıt olsun)
+
+
+def rebuild_rollups(args) -> None:
+    from app.db.rollups import rebuild_rollups as _rebuild
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = _rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Sınıf ruh hali özetleri {count} kayıttan yeniden oluşturuldu.")
+
+
+def migrate(args) -> None:
+    from app.db.migrations import current_version
+    from app.db.setup import prepare_database
+
+    # Uygulama açılışıyla aynı yol: çalışan worker'larla aynı kilidi paylaşır
+    applied = prepare_database(engine)
+    if applied:
+        print(f"Uygulanan geçişler: {', '.join(map(str, applied))}")
+    print(f"Şema sürümü: {current_version(engine)}")
+
+
+def check_indexes(args) -> None:
+    from app.db.query_plans import check_query_plans
+
+    failures = 0
+    for name, scans in check_query_plans(engine).items():
+        if scans:
+            failures += 1
+            print(f"[TARAMA] {name}: {'; '.join(scans)}")
+        else:
+            print(f"[OK]     {name}")
+
+    if failures:
+        sys.exit(1)
+
+
+def reconcile_presentations(args) -> None:
+    from app.db.catalog import reconcile_presentations as _reconcile
+
+    db = SessionLocal()
+    try:
+        report = _reconcile(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    prefix = "(deneme) " if args.dry_run else ""
+    for path in report["added"]:
+        print(f"{prefix}eklendi:   {path}")
+    for path in report["removed"]:
+        print(f"{prefix}silindi:   {path}")
+    for path in report["cache_removed"]:
+        print(f"{prefix}önbellek silindi: {path}")
+    for path in report["skipped"]:
+        print(f"atlandı (ad biçimi tanınmadı): {path}")
+
+    if report["unprocessed"] and not args.no_process:
+        statuses = asyncio.run(_process_presentations(report["unprocessed"]))
+        for presentation_id, status in statuses:
+            print(f"işlendi:   id={presentation_id} ({status})")
+
+
+async def _process_presentations(ids):
+    # Yüklemelerdeki arka plan işiyle aynı hat; en fazla PDF_WORKERS iş aynı anda
+    from sqlalchemy import select
+
+    from app.core import pdf_pipeline
+    from app.core.config import PDF_WORKERS
+    from app.db.database import AsyncSessionLocal, async_engine
+    from app.models.presentation import Presentation
+
+    semaphore = asyncio.Semaphore(max(1, PDF_WORKERS))
+
+    async def run(presentation_id):
+        async with semaphore:
+            await pdf_pipeline.process_presentation(presentation_id)
+
+    try:
+        await asyncio.gather(*(run(presentation_id) for presentation_id in ids))
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(Presentation.id, Presentation.processing_status).where(Presentation.id.in_(ids))
+            )
+            return sorted(rows.all())
+    finally:
+        pdf_pipeline.shutdown_pool()
+        await async_engine.dispose()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "rebuild-rollups", help="Sınıf ruh hali özetlerini moods tablosundan yeniden hesapla"
+    ).set_defaults(func=rebuild_rollups)
+
+    commands.add_parser(
+        "migrate", help="Bekleyen şema geçişlerini uygula"
+    ).set_defaults(func=migrate)
+
+    commands.add_parser(
+        "check-indexes", help="Sık kullanılan sorguların indeks kullandığını EXPLAIN QUERY PLAN ile doğrula"
+    ).set_defaults(func=check_indexes)
+
+    reconcile = commands.add_parser(
+        "reconcile-presentations", help="Sunum kataloğunu yükleme dizini ile uzlaştır"
+    )
+    reconcile.add_argument("--dry-run", action="store_true", help="Değişiklik yapmadan yalnızca raporla")
+    reconcile.add_argument(
+        "--no-process", action="store_true", help="İşlenmemiş sunumları PDF işleme hattından geçirme"
+    )
+    reconcile.set_defaults(func=reconcile_presentations)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# Ortam değişkenlerinden okunan uygulama ayarları.
+# Tüm değişkenler BALANCEED_ önekiyle tanımlanır; değer verilmezse varsayılan kullanılır.
+
+import os
+import secrets
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(f"BALANCEED_{name}")
+    return int(value) if value not in (None, "") else default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(f"BALANCEED_{name}") or default
+
+
+# Şifre hash'leme (bcrypt)
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+
+# Oturum token'ları (HMAC-SHA256 ile imzalı). SECRET_KEY zorunludur ve tüm worker'lar
+# aynı anahtarı kullanmalıdır; verilmezse uygulama açılmaz. Yalnızca geliştirmede
+# DEV_MODE=1 ile süreç başına rastgele bir anahtar üretilir (yeniden başlatmada ve
+# worker'lar arasında token'lar geçersiz olur).
+DEV_MODE = _env_int("DEV_MODE", 0)
+SECRET_KEY = _env_str("SECRET_KEY", "") or (secrets.token_urlsafe(32) if DEV_MODE else "")
+ACCESS_TOKEN_TTL_SECONDS = _env_int("ACCESS_TOKEN_TTL_SECONDS", 12 * 60 * 60)
+
+# get_current_user'ın kullanıcı kaydı önbelleği
+USER_CACHE_SIZE = _env_int("USER_CACHE_SIZE", 1024)
+USER_CACHE_TTL_SECONDS = _env_int("USER_CACHE_TTL_SECONDS", 300)
+
+# Chatbot yanıt önbelleği; ruh hali gönderimi ilgili kayıtları hemen siler,
+# TTL yalnızca başka süreçlerden gelen yazmalar için bayatlığı sınırlar
+CHATBOT_CACHE_SIZE = _env_int("CHATBOT_CACHE_SIZE", 4096)
+CHATBOT_CACHE_TTL_SECONDS = _env_int("CHATBOT_CACHE_TTL_SECONDS", 600)
+# /chatbot/recommend/batch isteğinde verilebilecek en fazla user_ids
+CHATBOT_BATCH_MAX_USERS = _env_int("CHATBOT_BATCH_MAX_USERS", 1000)
+
+# Veritabanı. ASYNC_DATABASE_URL verilmezse SQLite adresinden aiosqlite sürücüsüyle türetilir.
+DATABASE_URL = _env_str("DATABASE_URL", "sqlite:///./balanceed.db")
+ASYNC_DATABASE_URL = _env_str("ASYNC_DATABASE_URL", "")
+
+# SQLite bağlantı ayarları (her yeni bağlantıda PRAGMA olarak uygulanır)
+SQLITE_JOURNAL_MODE = _env_str("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = _env_str("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = _env_int("SQLITE_CACHE_SIZE", -64000)  # negatif: KiB cinsinden (~64 MB)
+SQLITE_MMAP_SIZE = _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+# Bağlantı havuzu
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 20)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+
+# Sunum yüklemeleri
+UPLOAD_DIR = _env_str("UPLOAD_DIR", "presentations")
+MAX_UPLOAD_BYTES = _env_int("MAX_UPLOAD_BYTES", 256 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = _env_int("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+
+# Arka plan PDF işleme (metin çıkarma, sayfa sayısı, küçük resim)
+PDF_WORKERS = _env_int("PDF_WORKERS", 2)
+PDF_THUMBNAIL_WIDTH = _env_int("PDF_THUMBNAIL_WIDTH", 320)
+
+# Ruh hali geçmişi sayfalama (keyset)
+HISTORY_PAGE_SIZE = _env_int("HISTORY_PAGE_SIZE", 100)
+HISTORY_MAX_PAGE_SIZE = _env_int("HISTORY_MAX_PAGE_SIZE", 1000)
+
+# Kovalı grafiklerde (bucket=day/week/month) since..until aralığındaki en fazla kova sayısı
+CHART_MAX_BUCKETS = _env_int("CHART_MAX_BUCKETS", 1000)
+
+# Toplu ruh hali gönderimi (/mood/submit/bulk) için tek istekteki en fazla kayıt
+BULK_SUBMIT_MAX_RECORDS = _env_int("BULK_SUBMIT_MAX_RECORDS", 5000)
+
+# Toplu dışa aktarım (/export): sunucu tarafı imleçten tek seferde okunan satır sayısı
+EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 5000)
+
+# Canlı panolar (SSE): abone başına kuyruk boyu ve bağlantıyı canlı tutan ping aralığı
+STREAM_QUEUE_SIZE = _env_int("STREAM_QUEUE_SIZE", 100)
+STREAM_HEARTBEAT_SECONDS = _env_int("STREAM_HEARTBEAT_SECONDS", 15)
+
+# İstek metrikleri (GET /metrics). Bir istek bu sayıdan fazla SQL sorgusu
+# çalıştırırsa uyarı loglanır (0 = kapalı)
+METRICS_ENABLED = _env_int("METRICS_ENABLED", 1)
+METRICS_QUERY_WARN_THRESHOLD = _env_int("METRICS_QUERY_WARN_THRESHOLD", 20)
+
+# Yavaş sorgu günlüğü (isteğe bağlı). SLOW_QUERY_MS > 0 ise bu süreyi aşan
+# sorgular normalize edilmiş SQL, parametre biçimi, rota ve EXPLAIN QUERY PLAN
+# çıktısıyla kaydedilir (GET /metrics/slow-queries)
+SLOW_QUERY_MS = _env_int("SLOW_QUERY_MS", 0)
+SLOW_QUERY_EXPLAIN = _env_int("SLOW_QUERY_EXPLAIN", 1)
+SLOW_QUERY_MAX_STATEMENTS = _env_int("SLOW_QUERY_MAX_STATEMENTS", 500)
+
+# Router modülleri ilk istekte yüklensin (import ve açılış süresini kısaltır;
+# ilk isteğin gecikmesi artar). Testler ve otomatik ölçeklenen worker'lar için
+LAZY_ROUTERS = _env_int("LAZY_ROUTERS", 0)
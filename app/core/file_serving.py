@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# Sunum dosyalarının HTTP üzerinden sunulması: koşullu istekler (ETag /
+# Last-Modified -> 304) burada, Range istekleri (206) Starlette FileResponse'ta
+# işlenir.
+#
+# Tam yanıtlarda sunucu ASGI "http.response.pathsend" uzantısını destekliyorsa
+# dosya sıfır kopyayla (sendfile) iletilir, aksi halde parça parça threadpool'da okunur.
+
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException, Request
+from starlette.responses import FileResponse, MalformedRangeHeader, Response
+
+
+def _etag(sha256: Optional[str], size_bytes: Optional[int], stat: os.stat_result) -> str:
+    # Yüklemede hesaplanan içerik özeti varsa (ve dosya boyutu hâlâ tutuyorsa)
+    # güçlü ETag olarak o kullanılır
+    if sha256 and size_bytes == stat.st_size:
+        return f'"{sha256}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _not_modified(request: Request, etag: str, stat: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(stat.st_mtime) <= since
+    return False
+
+
+class _FileResponse(FileResponse):
+    # Çözümlenemeyen Range başlığı yok sayılır ve dosyanın tamamı gönderilir (RFC 9110 §14.2);
+    # Starlette bu durumda 400 döner. Karşılanamayan aralıklar yine 416 olur
+    @classmethod
+    def _parse_range_header(cls, http_range: str, file_size: int):
+        try:
+            return super()._parse_range_header(http_range, file_size)
+        except MalformedRangeHeader:
+            return []
+
+
+async def file_response(
+    request: Request,
+    path: str,
+    sha256: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    media_type: str = "application/pdf",
+) -> Response:
+    try:
+        stat = await anyio.to_thread.run_sync(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı.")
+
+    etag = _etag(sha256, size_bytes, stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+
+    if _not_modified(request, etag, stat):
+        return Response(status_code=304, headers=headers)
+
+    # Range / If-Range (tekil ve çoklu aralık, 416) Starlette FileResponse'a bırakılır;
+    # If-Range yukarıdaki ETag ile karşılaştırılır
+    return _FileResponse(
+        path,
+        headers=headers,
+        media_type=media_type,
+        stat_result=stat,
+        filename=os.path.basename(path),
+        content_disposition_type="inline",
+    )
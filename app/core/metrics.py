@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+# Rota bazında istek metrikleri ve istek başına veritabanı sorgu sayacı.
+#
+# MetricsMiddleware her isteğin süresini, yanıt boyutunu ve eşzamanlı istek sayısını
+# kaydeder. instrument_engine ile bağlanan SQLAlchemy olayları, o anki isteğin
+# sorgu sayısını ve toplam DB süresini bir ContextVar üzerinden biriktirir.
+# Çıktı Prometheus metin biçimindedir (GET /metrics); ek bağımlılık gerekmez.
+
+import logging
+import os
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import METRICS_QUERY_WARN_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        # etiketler -> [kova sayaçları (son eleman +Inf), toplam, adet]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items())
+        bounds = [f'le="{bound}"' for bound in self.buckets] + ['le="+Inf"']
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+REQUESTS = Counter("balanceed_http_requests_total", "İstek sayısı", ("method", "route", "status"))
+LATENCY = Histogram("balanceed_http_request_duration_seconds", "İstek süresi", ("method", "route"))
+RESPONSE_SIZE = Histogram("balanceed_http_response_size_bytes", "Yanıt gövdesi boyutu", ("method", "route"), SIZE_BUCKETS)
+IN_FLIGHT = Gauge("balanceed_http_requests_in_flight", "Şu an işlenen istek sayısı")
+DB_QUERIES = Histogram("balanceed_db_queries_per_request", "İstek başına SQL sorgu sayısı", ("method", "route"), QUERY_BUCKETS)
+DB_TIME = Histogram("balanceed_db_seconds_per_request", "İstek başına toplam DB süresi", ("method", "route"))
+QUERY_WARNINGS = Counter(
+    "balanceed_db_query_threshold_exceeded_total", "Sorgu eşiğini aşan istek sayısı", ("method", "route")
+)
+
+REGISTRY: List[_Metric] = [REQUESTS, LATENCY, RESPONSE_SIZE, IN_FLIGHT, DB_QUERIES, DB_TIME, QUERY_WARNINGS]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestStats:
+    scope: dict
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("balanceed_request_stats", default=None)
+
+
+def current_route() -> Optional[str]:
+    # O an işlenen isteğin rota şablonu (istek dışında, ör. CLI'da None)
+    stats = current_request.get()
+    return _route_label(stats.scope) if stats is not None else None
+
+
+_instrumented: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    # Asenkron motorlar için `async_engine.sync_engine` verilir; create_app birden
+    # fazla kez çağrılsa da dinleyiciler bir kez eklenir
+    if sync_engine in _instrumented:
+        return
+    _instrumented.add(sync_engine)
+
+    # Başlangıç zamanı yürütme bağlamında tutulur: hata veren sorgu after_cursor_execute'a
+    # hiç ulaşmaz, bağlantı düzeyinde bir yığında kalsaydı sonraki ölçümleri kaydırırdı
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._balanceed_query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_balanceed_query_started", None)
+        stats = current_request.get()
+        if stats is not None and started is not None:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - started
+
+
+def _route_label(scope) -> str:
+    # Şablon yol (ör. /mood/history/{user_id}); eşleşmeyenler tek etikette toplanır.
+    # Yeni FastAPI sürümlerinde scope["route"] önek içermez; önekli şablon
+    # eşleşen rota bağlamında tutulur
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    for source in (context, scope.get("route")):
+        path = getattr(source, "path_format", None) or getattr(source, "path", None)
+        if path:
+            return path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    # Saf ASGI middleware: akış (SSE/dosya) yanıtlarını tamponlamaz
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        state = {"status": 500, "size": 0, "done": False}
+
+        def finish():
+            # Yanıt tamamlandığında bir kez; arka plan görevleri süreye katılmaz
+            if state["done"]:
+                return
+            state["done"] = True
+            method, route = scope["method"], _route_label(scope)
+            labels = (method, route)
+            REQUESTS.inc((method, route, str(state["status"])))
+            LATENCY.observe(labels, time.perf_counter() - started)
+            RESPONSE_SIZE.observe(labels, state["size"])
+            DB_QUERIES.observe(labels, stats.queries)
+            DB_TIME.observe(labels, stats.db_seconds)
+            if METRICS_QUERY_WARN_THRESHOLD and stats.queries > METRICS_QUERY_WARN_THRESHOLD:
+                QUERY_WARNINGS.inc(labels)
+                logger.warning(
+                    "%s %s tek istekte %d sorgu çalıştırdı (eşik %d, DB %.1f ms)",
+                    method, route, stats.queries, METRICS_QUERY_WARN_THRESHOLD, stats.db_seconds * 1000,
+                )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.pathsend":
+                # Sıfır kopya dosya gönderimi: gövde middleware'den geçmez
+                state["size"] = os.path.getsize(message["path"])
+                await send(message)
+                finish()
+                return
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await send(message)
+                    finish()
+                    return
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            finish()
+            current_request.reset(token)
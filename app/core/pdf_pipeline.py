@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Yüklenen sunumların arka planda işlenmesi. upload_presentation yanıtı döndükten
+# sonra çalışır; CPU yoğun çıkarma işi ayrı bir süreç havuzunda yapılır ve
+# sonuçlar presentations tablosuna yazılır.
+
+import anyio
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import PDF_THUMBNAIL_WIDTH, PDF_WORKERS, UPLOAD_DIR
+from app.core.pdf_worker import extract_pdf
+from app.db.database import AsyncSessionLocal
+from app.db.search import load_body, set_body_stmt
+from app.models import presentation as presentation_model
+
+logger = logging.getLogger(__name__)
+
+# İşlenmiş çıktılar içerik özetine göre saklanır: presentations/.cache/<sha256>/
+CACHE_DIR = os.path.join(UPLOAD_DIR, ".cache")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def process_presentation(presentation_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        presentation = await db.get(presentation_model.Presentation, presentation_id)
+        if presentation is None:
+            return
+
+        presentation.processing_status = "processing"
+        await db.commit()
+
+        cache_key = presentation.sha256 or f"id-{presentation.id}"
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                _get_pool(),
+                extract_pdf,
+                presentation.file_path,
+                os.path.join(CACHE_DIR, cache_key),
+                PDF_THUMBNAIL_WIDTH,
+            )
+        except Exception:
+            logger.exception("Sunum işlenemedi: id=%s", presentation_id)
+            presentation.processing_status = "failed"
+            await db.commit()
+            return
+
+        presentation.page_count = result["page_count"]
+        presentation.text_path = result["text_path"]
+        presentation.thumbnail_path = result["thumbnail_path"]
+        presentation.processing_status = "done"
+        presentation.processed_at = datetime.utcnow()
+        # Sayfa metni tam metin arama dizinine aynı transaction içinde yazılır
+        body = await anyio.to_thread.run_sync(load_body, result["text_path"])
+        await db.execute(set_body_stmt(), {"id": presentation.id, "body": body})
+        await db.commit()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Süreç havuzunda çalışan PDF çıkarma işi. Bu modül worker süreçlerine yüklendiği
+# için veritabanı / FastAPI bağımlılıkları içermez.
+#
+# PyMuPDF kuruluysa metin, sayfa sayısı ve ilk sayfa küçük resmi üretilir.
+# Yalnızca pypdf kuruluysa küçük resim atlanır.
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+PAGES_FILE = "pages.json"
+THUMBNAIL_FILE = "thumbnail.png"
+
+
+class PdfSupportMissing(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _backends():
+    # PDF kütüphaneleri ilk çıkarma işinde yüklenir; uygulama açılışını yavaşlatmaz
+    try:
+        import pymupdf
+    except ImportError:  # eski PyMuPDF sürümleri
+        try:
+            import fitz as pymupdf
+        except ImportError:
+            pymupdf = None
+
+    try:
+        import pypdf
+    except ImportError:
+        pypdf = None
+
+    return pymupdf, pypdf
+
+
+def _extract_with_pymupdf(pymupdf, path: str, thumbnail_path: str, thumbnail_width: int) -> List[str]:
+    with pymupdf.open(path) as document:
+        pages = [page.get_text() for page in document]
+        if document.page_count:
+            first = document[0]
+            zoom = thumbnail_width / max(first.rect.width, 1)
+            first.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom)).save(thumbnail_path)
+    return pages
+
+
+def _extract_with_pypdf(pypdf, path: str) -> List[str]:
+    reader = pypdf.PdfReader(path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def extract_pdf(path: str, cache_dir: str, thumbnail_width: int) -> Dict[str, Optional[object]]:
+    # Sonuçlar cache_dir'e yazılır; dizin zaten doluysa (aynı içerik daha önce
+    # işlendiyse) PDF yeniden açılmaz.
+    pages_path = os.path.join(cache_dir, PAGES_FILE)
+    thumbnail_path = os.path.join(cache_dir, THUMBNAIL_FILE)
+
+    if os.path.exists(pages_path):
+        with open(pages_path, encoding="utf-8") as f:
+            pages = json.load(f)
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+        pymupdf, pypdf = _backends()
+        if pymupdf is not None:
+            pages = _extract_with_pymupdf(pymupdf, path, thumbnail_path, thumbnail_width)
+        elif pypdf is not None:
+            pages = _extract_with_pypdf(pypdf, path)
+        else:
+            raise PdfSupportMissing("PDF işleme için PyMuPDF veya pypdf kurulu olmalı.")
+
+        tmp_path = pages_path + ".part"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        os.replace(tmp_path, pages_path)
+
+    return {
+        "page_count": len(pages),
+        "text_path": pages_path,
+        "thumbnail_path": thumbnail_path if os.path.exists(thumbnail_path) else None,
+    }
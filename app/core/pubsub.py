@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# Süreç içi yayın/abone (pub/sub) aracı; canlı panolar (SSE) için.
+#
+# Her abonenin kendi sınırlı kuyruğu vardır. Yavaş bir abonenin kuyruğu dolarsa en
+# eski mesajı atılır; yayıncı hiçbir zaman beklemez. Konu başına abone yoksa
+# yayın maliyeti tek bir sözlük aramasıdır.
+
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Set
+
+
+class PubSub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    @contextmanager
+    def subscribe(self, topic: str) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._topics[topic].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topic: str, message: Any) -> int:
+        # Olay döngüsü içinden çağrılmalıdır; teslim edilen abone sayısını döndürür
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+        for queue in subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+        return len(subscribers)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self._topics.get(topic))
+
+    def has_prefix(self, prefix: str) -> bool:
+        return any(topic.startswith(prefix) for topic in self._topics)
+
+    def stats(self) -> Dict[str, int]:
+        return {topic: len(subscribers) for topic, subscribers in self._topics.items()}
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+# Uygulamanın varsayılan JSON yanıt sınıfı.
+#
+# orjson kuruluysa gövde onunla üretilir (datetime/date doğrudan ISO 8601 olur);
+# değilse standart json ile aynı çıktı verilir. Büyük listeler için asıl kazanç,
+# router'larda tipli yanıt modelleri kullanıldığında FastAPI'nin öğe öğe
+# jsonable_encoder yerine pydantic ile doğrulayıp serileştirmesidir.
+
+import json
+from datetime import date, datetime, time
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemiyor")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class MessageResponse(BaseModel):
+    # Veri yokken dönen {"message": "..."} gövdeleri
+    message: str
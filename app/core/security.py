@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# Şifre hash'leme ve oturum token'ları.
+#
+# bcrypt çağrıları istek başına yüzlerce ms CPU harcadığı için ayrı, boyutu sınırlı
+# bir süreç havuzunda çalıştırılır; event loop ve diğer endpoint'lerin kullandığı
+# threadpool bu işle meşgul edilmez.
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from app.core.config import (
+    ACCESS_TOKEN_TTL_SECONDS,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    SECRET_KEY,
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # "spawn": çok thread'li sunucu sürecinden fork almanın kilitlenme riskini önler
+                _pool = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# Süreç havuzunda çalışan fonksiyonlar (pickle edilebilmeleri için modül seviyesinde)
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except ValueError:
+        # Geçerli bir bcrypt hash'i değil
+        return False
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    hashed = await loop.run_in_executor(_get_pool(), _hashpw, password.encode("utf-8"), BCRYPT_ROUNDS)
+    return hashed.decode("utf-8")
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_pool(), _checkpw, password.encode("utf-8"), hashed.encode("utf-8")
+    )
+
+
+def needs_rehash(hashed: str) -> bool:
+    # "$2b$12$..." biçimindeki hash'in maliyet faktörü ayarlanandan farklıysa True
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+# --- Oturum token'ları ---
+#
+# Biçim: base64url(json payload) + "." + base64url(HMAC-SHA256 imzası)
+# Payload: {"sub": kullanıcı id, "exp": bitiş (unix zamanı), "pv": şifre parmak izi}
+# "pv" sayesinde şifre değiştiğinde eski token'lar geçersiz olur.
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def check_secret_key() -> None:
+    # Lifespan başlangıcında çağrılır: anahtarsız imzalanan token'lar taklit edilebilir
+    if not SECRET_KEY:
+        raise RuntimeError(
+            "BALANCEED_SECRET_KEY ayarlanmamış. Üretimde tüm worker'lar için ortak, rastgele "
+            "bir anahtar verin; yalnızca geliştirmede BALANCEED_DEV_MODE=1 kullanılabilir."
+        )
+
+
+def _sign(body: str) -> str:
+    check_secret_key()
+    return _b64encode(hmac.new(SECRET_KEY.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest())
+
+
+def password_fingerprint(hashed: str) -> str:
+    return hashlib.sha256(hashed.encode("utf-8")).hexdigest()[:16]
+
+
+def create_access_token(user_id: int, hashed_password: str) -> str:
+    payload = {
+        "sub": user_id,
+        "exp": int(time.time()) + ACCESS_TOKEN_TTL_SECONDS,
+        "pv": password_fingerprint(hashed_password),
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return f"{body}.{_sign(body)}"
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    # İmza veya süre geçersizse None; veritabanına erişmez
+    try:
+        body, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(body)):
+            return None
+        payload = json.loads(_b64decode(body))
+    except (ValueError, UnicodeError):
+        return None
+
+    if not isinstance(payload, dict) or payload.get("exp", 0) < time.time():
+        return None
+    return payload
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+# Yüklenen dosyaların multipart gövdeden doğrudan diske akıtılması.
+#
+# UploadFile kullanıldığında Starlette gövdenin tamamını önce kendi geçici dosyasına
+# yazar: boyut sınırı ancak gövde bittikten sonra kontrol edilebilir ve dosya bir
+# kez daha kopyalanır. Burada request.stream() parça parça ayrıştırılır; dosya
+# parçası SHA-256 ile birlikte tek seferde geçici dosyaya yazılır ve sınır
+# aşıldığı anda okuma kesilir. Content-Length sınırın üzerindeyse gövde hiç okunmaz.
+
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, List, Optional
+
+import anyio
+from fastapi import HTTPException, Request
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # eski python-multipart sürümleri
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import UPLOAD_CHUNK_SIZE
+
+# Form alanları ve multipart sınırları için dosya boyutuna eklenen pay
+FORM_OVERHEAD_BYTES = 64 * 1024
+MAX_FIELD_BYTES = 4096
+
+
+@dataclass
+class ReceivedUpload:
+    fields: Dict[str, str] = field(default_factory=dict)
+    filename: Optional[str] = None
+    tmp_path: Optional[str] = None
+    size: int = 0
+    sha256: str = ""
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Dosya boyutu sınırı aşıldı ({max_bytes} bayt).")
+
+
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    # Thread içinde çalışır: hash ve disk yazımı event loop'u bloklamaz
+    digest.update(chunk)
+    f.write(chunk)
+
+
+def remove_if_exists(path: Optional[str]) -> None:
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _FormCollector:
+    # MultipartParser geri çağrıları (senkron): form alanlarını toplar, dosya
+    # parçasının verisini `pending`'e bırakır; diske yazma işi receive_upload'da
+    def __init__(self, file_field: str, max_bytes: int):
+        self.file_field = file_field
+        self.max_bytes = max_bytes
+        self.upload = ReceivedUpload()
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._kind = "skip"
+        self._name = ""
+        self._data = bytearray()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._kind = "skip"
+        self._name = ""
+        self._data = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = _decode(options.get(b"name", b""))
+        filename = options.get(b"filename")
+        if filename is None:
+            self._kind = "field"
+        elif self._name == self.file_field and self.upload.filename is None:
+            # Yalnızca ilk dosya parçası alınır; diğerleri yok sayılır
+            self._kind = "file"
+            self.upload.filename = _decode(filename)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._kind == "file":
+            self.upload.size += end - start
+            if self.upload.size > self.max_bytes:
+                raise _too_large(self.max_bytes)
+            self.pending.append(data[start:end])
+            self.pending_size += end - start
+        elif self._kind == "field":
+            self._data += data[start:end]
+            if len(self._data) > MAX_FIELD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Form alanı çok büyük: {self._name}")
+
+    def on_part_end(self) -> None:
+        if self._kind == "field":
+            self.upload.fields[self._name] = _decode(bytes(self._data))
+
+    def take_pending(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending.clear()
+        self.pending_size = 0
+        return data
+
+
+async def receive_upload(request: Request, tmp_dir: str, max_bytes: int, file_field: str = "file") -> ReceivedUpload:
+    # Dönen tmp_path'i taşımak ya da silmek (remove_if_exists) çağırana aittir
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise _too_large(max_bytes)
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="multipart/form-data gövdesi bekleniyor.")
+
+    collector = _FormCollector(file_field, max_bytes)
+    parser = MultipartParser(boundary, collector.callbacks())
+    digest = hashlib.sha256()
+
+    await anyio.to_thread.run_sync(partial(os.makedirs, tmp_dir, exist_ok=True))
+    tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.part")
+    try:
+        f = await anyio.to_thread.run_sync(open, tmp_path, "wb")
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if collector.pending_size >= UPLOAD_CHUNK_SIZE:
+                    await anyio.to_thread.run_sync(_write_chunk, f, digest, collector.take_pending())
+            parser.finalize()
+            if collector.pending:
+                await anyio.to_thread.run_sync(_write_chunk, f, digest, collector.take_pending())
+        finally:
+            await anyio.to_thread.run_sync(f.close)
+    except FormParserError:
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(remove_if_exists, tmp_path)
+        raise HTTPException(status_code=400, detail="Geçersiz multipart gövdesi.")
+    except BaseException:
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(remove_if_exists, tmp_path)
+        raise
+
+    upload = collector.upload
+    upload.tmp_path = tmp_path
+    upload.sha256 = digest.hexdigest()
+    return upload
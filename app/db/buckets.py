@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# Grafik endpoint'leri için zaman kovaları (gün / hafta / ay).
+#
+# Toplama SQL'de yapılır: (öğrenci, kova, ruh hali) başına sayı, toplam, min ve
+# max tek sorguda gelir; kova başına en fazla 5 satır olduğundan ortalama ve
+# baskın ruh hali Python'da ucuzca birleştirilir. Boş kovalar doldurulur.
+
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Literal, Optional
+
+from sqlalchemy import func, select
+
+from app.models import mood as mood_model, user as user_model
+
+Bucket = Literal["day", "week", "month"]
+
+
+def bucket_key(bucket: Bucket, column):
+    # Kova anahtarı, kovanın ilk günü (YYYY-MM-DD); hafta Pazartesi başlar
+    if bucket == "day":
+        return func.date(column)
+    if bucket == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-01", column)
+
+
+def bucket_start(bucket: Bucket, value: date) -> date:
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+
+def _next_bucket(bucket: Bucket, value: date) -> date:
+    if bucket == "day":
+        return value + timedelta(days=1)
+    if bucket == "week":
+        return value + timedelta(days=7)
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def bucket_count(bucket: Bucket, start: date, end: date) -> int:
+    # start..end aralığını kapsayan kova sayısı (iki uç dahil)
+    first, last = bucket_start(bucket, start), bucket_start(bucket, end)
+    if last < first:
+        return 0
+    if bucket == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days // (7 if bucket == "week" else 1) + 1
+
+
+def _time_filters(since: Optional[datetime], until: Optional[datetime]):
+    MoodEntry = mood_model.MoodEntry
+    filters = []
+    if since is not None:
+        filters.append(MoodEntry.timestamp >= since)
+    if until is not None:
+        filters.append(MoodEntry.timestamp <= until)
+    return filters
+
+
+def _stats_columns(key):
+    MoodEntry = mood_model.MoodEntry
+    return (
+        key.label("bucket"),
+        MoodEntry.mood,
+        func.count().label("entry_count"),
+        func.sum(MoodEntry.score).label("score_sum"),
+        func.min(MoodEntry.score).label("score_min"),
+        func.max(MoodEntry.score).label("score_max"),
+    )
+
+
+def user_bucket_stats_stmt(user_id: int, bucket: Bucket, since=None, until=None):
+    MoodEntry = mood_model.MoodEntry
+    key = bucket_key(bucket, MoodEntry.timestamp)
+    return (
+        select(*_stats_columns(key))
+        .where(MoodEntry.user_id == user_id, *_time_filters(since, until))
+        .group_by(key, MoodEntry.mood)
+        .order_by(key, MoodEntry.mood)
+    )
+
+
+def teacher_bucket_stats_stmt(teacher_id: int, bucket: Bucket, since=None, until=None):
+    MoodEntry = mood_model.MoodEntry
+    User = user_model.User
+    key = bucket_key(bucket, MoodEntry.timestamp)
+    return (
+        select(User.id, User.username, *_stats_columns(key))
+        .join(MoodEntry, MoodEntry.user_id == User.id)
+        .where(User.teacher_id == teacher_id, *_time_filters(since, until))
+        .group_by(User.id, key, MoodEntry.mood)
+        .order_by(User.id, key, MoodEntry.mood)
+    )
+
+
+def fold_buckets(rows, bucket: Bucket, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, List]:
+    # rows: kova sırasına göre (bucket, mood, entry_count, score_sum, score_min, score_max).
+    # Boşluklar start..end arasında doldurulur; aralığı çağıran sınırlar (bucket_count)
+    stats = {}
+    for key, group in groupby(rows, key=lambda row: row.bucket):
+        group = list(group)
+        count = sum(row.entry_count for row in group)
+        stats[key] = (
+            round(sum(row.score_sum for row in group) / count, 2),
+            min(row.score_min for row in group),
+            max(row.score_max for row in group),
+            max(group, key=lambda row: row.entry_count).mood,
+            count,
+        )
+
+    series = {"labels": [], "scores": [], "min_scores": [], "max_scores": [], "moods": [], "counts": []}
+    if not stats and (start is None or end is None):
+        return series
+
+    current = bucket_start(bucket, start) if start else date.fromisoformat(min(stats))
+    last = bucket_start(bucket, end) if end else date.fromisoformat(max(stats))
+    while current <= last:
+        label = current.isoformat()
+        average, low, high, mood, count = stats.get(label, (None, None, None, None, 0))
+        series["labels"].append(label)
+        series["scores"].append(average)
+        series["min_scores"].append(low)
+        series["max_scores"].append(high)
+        series["moods"].append(mood)
+        series["counts"].append(count)
+        current = _next_bucket(bucket, current)
+    return series
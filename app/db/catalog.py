@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Sunum kataloğu (presentations tablosu) ile yükleme dizini arasındaki uzlaştırma.
+#
+# API dışından diske eklenen "{class_id}_{ad}" biçimli dosyalar kataloğa eklenir
+# (API yüklemeleri "{class_id}_{sha256[:16]}_{ad}" biçimindedir); dosyası artık
+# bulunmayan kayıtlar katalogdan silinir, hiçbir kaydın kullanmadığı işleme
+# çıktıları (.cache/<sha256>) temizlenir. Yeni eklenen ve henüz işlenmemiş
+# kayıtların id'leri döndürülür; CLI bunları PDF işleme hattından geçirir.
+#
+#   python -m app.cli reconcile-presentations [--dry-run] [--no-process]
+
+import hashlib
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Dict, List, Set
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import UPLOAD_CHUNK_SIZE, UPLOAD_DIR
+from app.models import presentation as presentation_model
+
+_HASH_PART = re.compile(r"^(\d+_)[0-9a-f]{16}_")
+
+
+def display_name(path: str) -> str:
+    # Saklanan addan içerik özeti çıkarılır: "{class_id}_{sha256[:16]}_{ad}" -> "{class_id}_{ad}"
+    # (istemcilere gösterilen, yükleme öncesindeki ad biçimi)
+    return _HASH_PART.sub(r"\1", os.path.basename(path), count=1)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _files_on_disk(upload_dir: str) -> Dict[str, os.DirEntry]:
+    # Gizli girdiler (ör. yükleme sırasında kullanılan .tmp dizini) atlanır
+    with os.scandir(upload_dir) as entries:
+        return {
+            f"{upload_dir}/{entry.name}": entry
+            for entry in entries
+            if entry.is_file() and not entry.name.startswith(".")
+        }
+
+
+def _cache_keys(db: Session) -> Set[str]:
+    # pdf_pipeline.process_presentation ile aynı anahtar: sha256, yoksa "id-<id>"
+    Presentation = presentation_model.Presentation
+    rows = db.execute(select(Presentation.id, Presentation.sha256)).all()
+    return {row.sha256 or f"id-{row.id}" for row in rows}
+
+
+def _stale_cache_dirs(db: Session, upload_dir: str) -> List[str]:
+    cache_dir = os.path.join(upload_dir, ".cache")
+    if not os.path.isdir(cache_dir):
+        return []
+    keys = _cache_keys(db)
+    with os.scandir(cache_dir) as entries:
+        return sorted(entry.path for entry in entries if entry.is_dir() and entry.name not in keys)
+
+
+def _unprocessed_ids(db: Session) -> List[int]:
+    # Arka plan işlemesi hiç çalışmamış kayıtlar (ör. API dışından eklenenler)
+    Presentation = presentation_model.Presentation
+    return list(db.execute(
+        select(Presentation.id).where(
+            Presentation.text_path.is_(None),
+            or_(Presentation.processing_status.is_(None), Presentation.processing_status == "pending"),
+        ).order_by(Presentation.id)
+    ).scalars())
+
+
+def reconcile_presentations(db: Session, upload_dir: str = UPLOAD_DIR, dry_run: bool = False) -> Dict[str, List]:
+    # Rapor: added / removed / skipped (yollar), cache_removed (dizinler),
+    # unprocessed (PDF işleme hattına verilecek kayıt id'leri; dry_run'da boş)
+    Presentation = presentation_model.Presentation
+    report: Dict[str, List] = {"added": [], "removed": [], "skipped": [], "cache_removed": [], "unprocessed": []}
+
+    on_disk = _files_on_disk(upload_dir)
+    rows = db.execute(select(Presentation.id, Presentation.file_path)).all()
+    known = {row.file_path for row in rows}
+
+    missing_ids = [row.id for row in rows if row.file_path not in on_disk]
+    report["removed"] = [row.file_path for row in rows if row.file_path not in on_disk]
+
+    for path in sorted(set(on_disk) - known):
+        entry = on_disk[path]
+        class_part, sep, name = display_name(entry.name).partition("_")
+        if not sep or not class_part.isdigit() or not name:
+            report["skipped"].append(path)
+            continue
+
+        report["added"].append(path)
+        if dry_run:
+            continue
+
+        stat = entry.stat()
+        db.add(Presentation(
+            class_id=int(class_part),
+            title=os.path.splitext(name)[0],
+            file_path=path,
+            upload_timestamp=datetime.utcfromtimestamp(stat.st_mtime),
+            sha256=_sha256(path),
+            size_bytes=stat.st_size,
+        ))
+
+    if not dry_run:
+        if missing_ids:
+            db.execute(delete(Presentation).where(Presentation.id.in_(missing_ids)))
+        db.commit()
+        report["unprocessed"] = _unprocessed_ids(db)
+
+    # Kayıtlar silindikten sonra hesaplanır: dry_run'da yalnızca bugünkü yetimler raporlanır
+    report["cache_removed"] = _stale_cache_dirs(db, upload_dir)
+    if not dry_run:
+        for path in report["cache_removed"]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    return report
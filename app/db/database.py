@@ -1,21 +1,102 @@
-from typing import Generator
-from sqlalchemy import create_engine
+from typing import AsyncGenerator, Dict, Generator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./balanceed.db"
+from app.core import config
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+# Aynı veritabanı, aiosqlite sürücüsü üzerinden (router'lar bunu kullanır)
+ASYNC_SQLALCHEMY_DATABASE_URL = config.ASYNC_DATABASE_URL or SQLALCHEMY_DATABASE_URL.replace(
+    "sqlite://", "sqlite+aiosqlite://", 1
 )
 
+
+def sqlite_pragmas() -> Dict[str, object]:
+    # Ayarlardan okunan varsayılan PRAGMA'lar; WAL ile okuyucular yazarları beklemez
+    return {
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory(url: str) -> bool:
+    return ":memory:" in url or url.rstrip("/").endswith("sqlite:")
+
+
+def _engine_kwargs(url: str) -> dict:
+    if _is_sqlite(url) and _is_memory(url):
+        return {}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_pre_ping": not _is_sqlite(url),
+    }
+
+
+def _install_pragmas(sync_engine: Engine, pragmas: Dict[str, object]) -> None:
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas: Optional[Dict[str, object]] = None) -> Engine:
+    # pragmas=None ayarlardaki varsayılanları, {} hiçbir PRAGMA uygulamamayı ifade eder
+    connect_args = {"check_same_thread": False} if _is_sqlite(url) else {}
+    db_engine = create_engine(url, connect_args=connect_args, **_engine_kwargs(url))
+    if _is_sqlite(url):
+        _install_pragmas(db_engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return db_engine
+
+
+def create_async_db_engine(
+    url: str = ASYNC_SQLALCHEMY_DATABASE_URL, pragmas: Optional[Dict[str, object]] = None
+) -> AsyncEngine:
+    db_engine = create_async_engine(url, **_engine_kwargs(url))
+    if _is_sqlite(url):
+        _install_pragmas(db_engine.sync_engine, sqlite_pragmas() if pragmas is None else pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+
+# İsteğe bağlı yavaş sorgu günlüğü (bkz. app/db/profiling.py)
+if config.SLOW_QUERY_MS > 0:
+    from app.db import profiling
+
+    profiling.install(engine)
+    profiling.install(async_engine.sync_engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: commit sonrası nesne alanlarına erişmek yeni sorgu (ve await) gerektirmesin
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-# Dependency
+# Dependency (komut satırı araçları ve geçişler için senkron oturum)
 def get_db() -> Generator:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Dependency (router'lar için asenkron oturum)
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
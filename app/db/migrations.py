@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# Hafif, sürüm numaralı şema geçişleri.
+#
+# `Base.metadata.create_all` yalnızca eksik tabloları oluşturur; var olan tablolara
+# indeks/sütun eklemez. Buradaki geçişler sırayla uygulanır ve uygulanan son sürüm
+# SQLite'ın `PRAGMA user_version` alanında tutulur. Her geçiş kendi transaction'ında
+# çalışır ve yeni kurulmuş (create_all ile oluşturulmuş) bir veritabanında da
+# sorunsuz çalışacak şekilde idempotent yazılmalıdır.
+
+from typing import Callable, List, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+
+
+def _create_indexes(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_moods_user_id_timestamp ON moods (user_id, timestamp)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_moods_class_id_timestamp ON moods (class_id, timestamp)"
+    )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_users_teacher_id ON users (teacher_id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_users_class_id ON users (class_id)")
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    # SQLite'ta "ADD COLUMN IF NOT EXISTS" yok; sütun varlığı önce kontrol edilir
+    existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _populate_rollups(conn: Connection) -> None:
+    from app.db.rollups import rebuild_rollups
+
+    rebuild_rollups(conn)
+
+
+def _presentation_file_metadata(conn: Connection) -> None:
+    _add_column(conn, "presentations", "sha256", "VARCHAR(64)")
+    _add_column(conn, "presentations", "size_bytes", "INTEGER")
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_presentations_sha256 ON presentations (sha256)"
+    )
+
+
+def _presentation_catalog_index(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_presentations_class_id_upload_timestamp "
+        "ON presentations (class_id, upload_timestamp)"
+    )
+
+
+def _presentation_processing(conn: Connection) -> None:
+    _add_column(conn, "presentations", "processing_status", "VARCHAR")
+    _add_column(conn, "presentations", "page_count", "INTEGER")
+    _add_column(conn, "presentations", "text_path", "VARCHAR")
+    _add_column(conn, "presentations", "thumbnail_path", "VARCHAR")
+    _add_column(conn, "presentations", "processed_at", "DATETIME")
+
+
+def _presentation_search(conn: Connection) -> None:
+    import os
+    from app.db.search import CREATE_STATEMENTS, SEARCH_TABLE, load_body, set_body_stmt
+
+    for statement in CREATE_STATEMENTS:
+        conn.exec_driver_sql(statement)
+
+    # Mevcut sunumları dizine ekle; işlenmiş olanların sayfa metinleri diskteki önbellekten okunur
+    conn.exec_driver_sql(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, title, body) "
+        f"SELECT id, coalesce(title, ''), '' FROM presentations "
+        f"WHERE id NOT IN (SELECT rowid FROM {SEARCH_TABLE})"
+    )
+    rows = conn.exec_driver_sql(
+        "SELECT id, text_path FROM presentations WHERE text_path IS NOT NULL"
+    ).all()
+    for presentation_id, text_path in rows:
+        if os.path.exists(text_path):
+            conn.execute(set_body_stmt(), {"id": presentation_id, "body": load_body(text_path)})
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "moods/users bileşik indeksleri", _create_indexes),
+    (2, "sınıf ruh hali özetlerini mevcut kayıtlardan doldur", _populate_rollups),
+    (3, "presentations.sha256 / size_bytes", _presentation_file_metadata),
+    (4, "presentations (class_id, upload_timestamp) indeksi", _presentation_catalog_index),
+    (5, "presentations PDF işleme sütunları", _presentation_processing),
+    (6, "presentation_search FTS5 dizini ve tetikleyicileri", _presentation_search),
+]
+
+
+def current_version(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    # Henüz uygulanmamış geçişleri sırayla uygular, uygulananların sürümlerini döndürür
+    applied = []
+    version = current_version(engine)
+
+    for target, _description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(target)}")
+        applied.append(target)
+
+    return applied
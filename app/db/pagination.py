@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# (timestamp, id) üzerinden keyset (cursor) sayfalama.
+#
+# OFFSET'in aksine her sayfa, (user_id, timestamp) indeksinde doğrudan imlecin
+# konumundan okunmaya başlar; uzun geçmişlerde de ilk ve sonraki sayfalar aynı
+# maliyettedir. İmleç istemciye opak bir base64 dizesi olarak verilir.
+
+import base64
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import literal, tuple_
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    # Bozuk imleçte ValueError
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (UnicodeDecodeError, base64.binascii.Error) as exc:
+        raise ValueError("geçersiz imleç") from exc
+
+
+def keyset(stmt, timestamp_column, id_column, after: Optional[Cursor], limit: int, newest_first: bool):
+    # Sıralamayı ve imleç koşulunu uygular; sonraki sayfa olup olmadığını anlamak
+    # için bir fazla satır ister (bkz. split_page)
+    key = tuple_(timestamp_column, id_column)
+    if after is not None:
+        bound = tuple_(literal(after[0], timestamp_column.type), literal(after[1], id_column.type))
+        stmt = stmt.where(key < bound if newest_first else key > bound)
+    if newest_first:
+        stmt = stmt.order_by(timestamp_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(timestamp_column.asc(), id_column.asc())
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    # Satırlarda `timestamp` ve `id` alanları bulunmalı
+    page = list(rows[:limit])
+    next_cursor = encode_cursor(page[-1].timestamp, page[-1].id) if len(rows) > limit else None
+    return page, next_cursor
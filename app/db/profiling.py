@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+# İsteğe bağlı yavaş sorgu günlüğü (BALANCEED_SLOW_QUERY_MS > 0 ile açılır).
+#
+# Her ifade cursor olaylarıyla zamanlanır. Eşiği aşanlar normalize edilmiş SQL'e göre
+# gruplanır: adet, toplam/en yüksek süre, parametre biçimi, hangi rotalardan geldiği
+# ve (SQLite'ta, grup başına bir kez) EXPLAIN QUERY PLAN çıktısı tutulur. Plan,
+# `app.db.query_plans.full_scans` ile indekssiz tablo taramaları için işaretlenir.
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import config
+from app.core.metrics import current_route
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN \((?:\?, )*\?\)")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def normalize_sql(statement: str) -> str:
+    # Aynı biçimdeki sorgular tek grupta toplansın: sabitler ve IN listeleri "?"
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _IN_LIST.sub("IN (?...)", sql)
+
+
+def _types(values) -> str:
+    names = [type(value).__name__ for value in values]
+    parts = [
+        f"{name} x {count}" if count > 1 else name
+        for name, count in ((name, len(list(group))) for name, group in groupby(names))
+    ]
+    return "(" + ", ".join(parts) + ")"
+
+
+def param_shape(parameters, executemany: bool) -> str:
+    # Değerler değil yalnızca türleri; ör. "(int, datetime x 2)" ya da "500 x (int, str)"
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {param_shape(rows[0], False)}" if rows else "0 x ()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    return _types(parameters or ())
+
+
+@dataclass
+class SlowStatement:
+    sql: str
+    param_shape: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: Optional[datetime] = None
+    routes: Counter = field(default_factory=Counter)
+    plan: Optional[List[str]] = None
+    full_scans: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "param_shape": self.param_shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2),
+            "max_ms": round(self.max_ms, 2),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "routes": dict(self.routes.most_common()),
+            "plan": self.plan,
+            "full_scans": self.full_scans,
+        }
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, max_statements: int, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self.explain = explain
+        self._statements: Dict[str, SlowStatement] = {}
+        self._lock = threading.Lock()
+
+    def record(self, conn, statement: str, parameters, executemany: bool, elapsed_ms: float) -> None:
+        sql = normalize_sql(statement)
+        route = current_route() or "-"
+        shape = param_shape(parameters, executemany)
+
+        with self._lock:
+            entry = self._statements.get(sql)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    # Dolu: toplam süresi en düşük grup yer açar
+                    del self._statements[min(self._statements.values(), key=lambda e: e.total_ms).sql]
+                entry = self._statements[sql] = SlowStatement(sql=sql, param_shape=shape)
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.last_seen = datetime.utcnow()
+            entry.routes[route] += 1
+            needs_plan = entry.plan is None
+
+        if needs_plan and self.explain and not executemany and conn.dialect.name == "sqlite":
+            plan = _explain(conn, statement, parameters)
+            if plan is not None:
+                from app.db.query_plans import full_scans
+
+                with self._lock:
+                    entry.plan = plan
+                    entry.full_scans = full_scans(plan)
+
+        logger.warning(
+            "Yavaş sorgu %.1f ms [%s] %s params=%s%s",
+            elapsed_ms, route, sql, shape,
+            f" TAM TARAMA: {entry.full_scans}" if entry.full_scans else "",
+        )
+
+    def report(self, limit: int = 20, order_by: str = "total_ms") -> List[dict]:
+        with self._lock:
+            entries = sorted(self._statements.values(), key=lambda e: getattr(e, order_by), reverse=True)[:limit]
+            return [entry.as_dict() for entry in entries]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    # Olaylar tetiklenmesin diye doğrudan DBAPI cursor'ı (sqlite3 ya da aiosqlite adaptörü)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as exc:
+        return [f"EXPLAIN başarısız: {exc}"]
+    finally:
+        cursor.close()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=config.SLOW_QUERY_MS,
+    max_statements=config.SLOW_QUERY_MAX_STATEMENTS,
+    explain=bool(config.SLOW_QUERY_EXPLAIN),
+)
+
+
+def install(sync_engine: Engine, log: SlowQueryLog = slow_query_log) -> None:
+    # Asenkron motorlar için `async_engine.sync_engine` verilir
+    # Başlangıç zamanı yürütme bağlamında (hata veren sorgu bir şey bırakmaz; EXPLAIN
+    # için açılan iç içe yürütmenin de kendi bağlamı vardır)
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._balanceed_profile_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_balanceed_profile_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= log.threshold_ms:
+            log.record(conn, statement, parameters, executemany, elapsed_ms)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+# Birden fazla router tarafından paylaşılan, küme tabanlı (set-based) sorgular.
+# Fonksiyonlar yalnızca `select` ifadesi üretir; çalıştırma işi çağırana kalır.
+
+from datetime import date, datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, func, select
+
+from app.models import mood as mood_model, user as user_model
+
+
+def latest_moods_stmt(teacher_id: int, class_id: Optional[int] = None):
+    """Öğretmenin her öğrencisi için en son MoodEntry'yi tek sorguda döndürür.
+
+    Kayıt bulunmayan öğrenciler de (score/mood/timestamp = NULL) satır olarak gelir;
+    böylece çağıran taraf "öğrenci yok" ile "veri yok" durumlarını ayırt edebilir.
+    """
+    MoodEntry = mood_model.MoodEntry
+    User = user_model.User
+
+    students = select(User.id).where(User.teacher_id == teacher_id)
+
+    ranked = select(
+        MoodEntry.user_id,
+        MoodEntry.score,
+        MoodEntry.mood,
+        MoodEntry.timestamp,
+        func.row_number().over(
+            partition_by=MoodEntry.user_id,
+            order_by=(MoodEntry.timestamp.desc(), MoodEntry.id.desc()),
+        ).label("rn"),
+    ).where(MoodEntry.user_id.in_(students))
+    if class_id is not None:
+        ranked = ranked.where(MoodEntry.class_id == class_id)
+    ranked = ranked.subquery()
+
+    return (
+        select(User.id, User.username, ranked.c.score, ranked.c.mood, ranked.c.timestamp)
+        .outerjoin(ranked, and_(ranked.c.user_id == User.id, ranked.c.rn == 1))
+        .where(User.teacher_id == teacher_id)
+        .order_by(User.id)
+    )
+
+
+
+def latest_entries_stmt(class_id: Optional[int] = None, user_ids: Optional[List[int]] = None):
+    # Sınıftaki (ve/veya verilen) her öğrencinin en son kaydı; toplu chatbot önerisi için
+    MoodEntry = mood_model.MoodEntry
+
+    ranked = select(
+        MoodEntry.user_id,
+        MoodEntry.score,
+        MoodEntry.mood,
+        MoodEntry.timestamp,
+        func.row_number().over(
+            partition_by=MoodEntry.user_id,
+            order_by=(MoodEntry.timestamp.desc(), MoodEntry.id.desc()),
+        ).label("rn"),
+    )
+    if class_id is not None:
+        ranked = ranked.where(MoodEntry.class_id == class_id)
+    if user_ids is not None:
+        ranked = ranked.where(MoodEntry.user_id.in_(user_ids))
+    ranked = ranked.subquery()
+
+    return (
+        select(ranked.c.user_id, ranked.c.score, ranked.c.mood, ranked.c.timestamp)
+        .where(ranked.c.rn == 1)
+        .order_by(ranked.c.user_id)
+    )
+
+def teacher_mood_entries_stmt(
+    teacher_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Öğretmenin tüm öğrencilerinin kayıtlarını (öğrenci, zaman) sırasıyla tek sorguda döndürür.
+
+    Zaman aralığı join koşulunda uygulanır; aralıkta kaydı olmayan öğrenciler
+    tek bir NULL satırla gelir. `label` gün bilgisini SQL tarafında biçimlendirir.
+    """
+    MoodEntry = mood_model.MoodEntry
+    User = user_model.User
+
+    join_on = MoodEntry.user_id == User.id
+    if since is not None:
+        join_on = and_(join_on, MoodEntry.timestamp >= since)
+    if until is not None:
+        join_on = and_(join_on, MoodEntry.timestamp <= until)
+
+    return (
+        select(
+            User.id,
+            User.username,
+            func.date(MoodEntry.timestamp).label("label"),
+            MoodEntry.score,
+        )
+        .outerjoin(MoodEntry, join_on)
+        .where(User.teacher_id == teacher_id)
+        .order_by(User.id, MoodEntry.timestamp, MoodEntry.id)
+    )
+
+
+def teacher_mood_totals_stmt(teacher_id: int):
+    # Öğretmenin öğrencilerinin girişleri ruh haline göre toplanır; satırlar
+    # class_totals_stmt ile aynı biçimde (mood, entry_count, score_sum) gelir
+    MoodEntry = mood_model.MoodEntry
+    User = user_model.User
+
+    students = select(User.id).where(User.teacher_id == teacher_id)
+    return (
+        select(
+            MoodEntry.mood,
+            func.count(MoodEntry.id).label("entry_count"),
+            func.coalesce(func.sum(MoodEntry.score), 0).label("score_sum"),
+        )
+        .where(MoodEntry.user_id.in_(students), MoodEntry.mood.isnot(None))
+        .group_by(MoodEntry.mood)
+    )
+
+
+def mood_export_stmt(
+    class_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Dışa aktarım için MoodEntry satırları (kullanıcı adıyla), sınıf ya da öğretmen bazında.
+
+    Sınıf aktarımı (class_id, timestamp) indeksini sırasıyla okur; öğretmen aktarımı
+    öğrencileri sırayla gezip her birinin (user_id, timestamp) indeksini okur. İki
+    durumda da ayrı bir sıralama adımı gerekmez, satırlar akış hâlinde gelir.
+    """
+    MoodEntry = mood_model.MoodEntry
+    User = user_model.User
+
+    stmt = select(
+        MoodEntry.id,
+        MoodEntry.user_id,
+        User.username,
+        MoodEntry.class_id,
+        MoodEntry.score,
+        MoodEntry.mood,
+        MoodEntry.timestamp,
+    )
+    if teacher_id is not None:
+        stmt = (
+            stmt.join(User, User.id == MoodEntry.user_id)
+            .where(User.teacher_id == teacher_id)
+            .order_by(User.id, MoodEntry.timestamp, MoodEntry.id)
+        )
+    else:
+        stmt = stmt.outerjoin(User, User.id == MoodEntry.user_id).order_by(MoodEntry.timestamp, MoodEntry.id)
+    if class_id is not None:
+        stmt = stmt.where(MoodEntry.class_id == class_id)
+    if since is not None:
+        stmt = stmt.where(MoodEntry.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(MoodEntry.timestamp <= until)
+    return stmt
+
+
+def same_day_entry_stmt(user_id: int, class_id: int, day: date):
+    # submit_mood_test'in "bugün zaten gönderilmiş mi" kontrolü
+    MoodEntry = mood_model.MoodEntry
+    return select(MoodEntry.id).where(
+        MoodEntry.user_id == user_id,
+        MoodEntry.class_id == class_id,
+        MoodEntry.timestamp >= datetime.combine(day, datetime.min.time()),
+        MoodEntry.timestamp <= datetime.combine(day, datetime.max.time()),
+    ).limit(1)
+
+
+def same_day_entries_stmt(class_ids: Iterable[int], day: date):
+    # Toplu gönderimde tekrar kontrolü: batch'teki sınıfların o günkü tüm
+    # (user_id, class_id) çiftleri tek sorguda gelir
+    MoodEntry = mood_model.MoodEntry
+    return select(MoodEntry.user_id, MoodEntry.class_id).where(
+        MoodEntry.class_id.in_(sorted(set(class_ids))),
+        MoodEntry.timestamp >= datetime.combine(day, datetime.min.time()),
+        MoodEntry.timestamp <= datetime.combine(day, datetime.max.time()),
+    ).distinct()
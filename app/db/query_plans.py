@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Sık çalışan sorguların `EXPLAIN QUERY PLAN` çıktısını kontrol eder.
+# Bir tabloya indeks kullanmadan erişen (düz "SCAN <tablo>") sorgular raporlanır.
+#
+#   python -m app.cli check-indexes
+
+from datetime import date, datetime
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from app.db.buckets import teacher_bucket_stats_stmt, user_bucket_stats_stmt
+from app.db.pagination import keyset
+from app.db.queries import latest_entries_stmt, latest_moods_stmt, same_day_entries_stmt, same_day_entry_stmt, teacher_mood_entries_stmt, teacher_mood_totals_stmt, mood_export_stmt
+from app.db.rollups import class_totals_stmt
+from app.models import mood as mood_model, presentation as presentation_model, user as user_model
+
+# Planda indeks kullanması beklenen gerçek tablolar
+CHECKED_TABLES = {"moods", "users", "presentations", "class_mood_totals", "class_mood_daily"}
+
+
+def _user_history_page():
+    MoodEntry = mood_model.MoodEntry
+    return keyset(
+        select(MoodEntry.id, MoodEntry.timestamp, MoodEntry.score, MoodEntry.mood).where(MoodEntry.user_id == 1),
+        MoodEntry.timestamp, MoodEntry.id, (datetime(2030, 1, 1), 1), 100, newest_first=True,
+    )
+
+
+def _teacher_students():
+    return select(user_model.User).where(user_model.User.teacher_id == 1)
+
+
+def _class_entries_since():
+    MoodEntry = mood_model.MoodEntry
+    return select(MoodEntry).where(MoodEntry.class_id == 1, MoodEntry.timestamp >= datetime(2000, 1, 1))
+
+
+def _class_presentations():
+    Presentation = presentation_model.Presentation
+    return select(Presentation.file_path).where(Presentation.class_id == 1).order_by(Presentation.upload_timestamp)
+
+
+HOT_QUERIES: List[Tuple[str, Callable]] = [
+    ("submit_mood_test: günlük tekrar kontrolü", lambda: same_day_entry_stmt(1, 1, date.today())),
+    ("toplu gönderim: günlük tekrar kontrolü", lambda: same_day_entries_stmt([1, 2, 3], date.today())),
+    ("kullanıcı ruh hali geçmişi (sayfalı)", _user_history_page),
+    ("öğretmenin öğrencileri", _teacher_students),
+    ("öğrencilerin son ruh halleri", lambda: latest_moods_stmt(1)),
+    ("toplu chatbot önerisi (sınıf)", lambda: latest_entries_stmt(class_id=1)),
+    ("öğretmen grafik verisi", lambda: teacher_mood_entries_stmt(1)),
+    ("kullanıcı grafik verisi (haftalık kova)", lambda: user_bucket_stats_stmt(1, "week")),
+    ("öğretmen grafik verisi (haftalık kova)", lambda: teacher_bucket_stats_stmt(1, "week")),
+    ("sınıf kayıtları (zaman aralığı)", _class_entries_since),
+    ("sınıf özeti", lambda: class_totals_stmt(1)),
+    ("öğretmen sınıf özeti", lambda: teacher_mood_totals_stmt(1)),
+    ("sınıf dışa aktarımı", lambda: mood_export_stmt(class_id=1)),
+    ("öğretmen dışa aktarımı", lambda: mood_export_stmt(teacher_id=1)),
+    ("sınıf sunum listesi", _class_presentations),
+]
+
+
+def explain(engine: Engine, stmt) -> List[str]:
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).all()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    # "SCAN moods" kötü; "SCAN moods USING INDEX ..." ya da "SEARCH ..." kabul edilir
+    bad = []
+    for detail in plan:
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and words[1] in CHECKED_TABLES and "USING" not in words:
+            bad.append(detail)
+    return bad
+
+
+def check_query_plans(engine: Engine) -> Dict[str, List[str]]:
+    # Sorgu adı -> indekssiz tablo taramaları (boş liste = sorun yok)
+    return {name: full_scans(explain(engine, build())) for name, build in HOT_QUERIES}
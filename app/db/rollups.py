@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+# Sınıf ruh hali özet tablolarının (class_mood_totals / class_mood_daily) bakımı.
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import mood as mood_model
+from app.models.mood_rollup import ClassMoodTotal, ClassMoodDaily
+
+
+def _upsert(table):
+    # Parametreler execute sırasında verilir; tek satır ya da executemany için aynı ifade
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key.columns],
+        set_={
+            "entry_count": table.c.entry_count + stmt.excluded.entry_count,
+            "score_sum": table.c.score_sum + stmt.excluded.score_sum,
+        },
+    )
+
+
+async def record_mood_entry(db: AsyncSession, class_id: int, mood: str, score: int, timestamp: datetime) -> None:
+    # Commit çağırana aittir; böylece kayıt ve özet aynı transaction'da yazılır
+    await db.execute(_upsert(ClassMoodTotal.__table__), {
+        "class_id": class_id, "mood": mood, "entry_count": 1, "score_sum": score,
+    })
+    await db.execute(_upsert(ClassMoodDaily.__table__), {
+        "class_id": class_id, "day": timestamp.date(), "mood": mood, "entry_count": 1, "score_sum": score,
+    })
+
+
+async def record_mood_entries(db: AsyncSession, entries: Iterable[dict]) -> None:
+    # Toplu gönderim için: önce (sınıf, ruh hali) ve (sınıf, gün, ruh hali) bazında
+    # toplanır, sonra her özet tablosuna tek executemany ile yazılır
+    totals = defaultdict(lambda: [0, 0])
+    daily = defaultdict(lambda: [0, 0])
+    for entry in entries:
+        for counter in (
+            totals[(entry["class_id"], entry["mood"])],
+            daily[(entry["class_id"], entry["timestamp"].date(), entry["mood"])],
+        ):
+            counter[0] += 1
+            counter[1] += entry["score"]
+
+    if not totals:
+        return
+
+    await db.execute(_upsert(ClassMoodTotal.__table__), [
+        {"class_id": class_id, "mood": mood, "entry_count": count, "score_sum": score_sum}
+        for (class_id, mood), (count, score_sum) in totals.items()
+    ])
+    await db.execute(_upsert(ClassMoodDaily.__table__), [
+        {"class_id": class_id, "day": day, "mood": mood, "entry_count": count, "score_sum": score_sum}
+        for (class_id, day, mood), (count, score_sum) in daily.items()
+    ])
+
+
+def class_totals_stmt(class_id: int):
+    return select(ClassMoodTotal.mood, ClassMoodTotal.entry_count, ClassMoodTotal.score_sum).where(
+        ClassMoodTotal.class_id == class_id
+    )
+
+
+def _raw_class_totals_stmt(class_id: int):
+    # class_totals_stmt ile aynı satırlar, doğrudan moods tablosundan
+    MoodEntry = mood_model.MoodEntry
+    return (
+        select(
+            MoodEntry.mood,
+            func.count().label("entry_count"),
+            func.coalesce(func.sum(MoodEntry.score), 0).label("score_sum"),
+        )
+        .where(MoodEntry.class_id == class_id, MoodEntry.mood.isnot(None))
+        .group_by(MoodEntry.mood)
+    )
+
+
+async def class_summary(db: AsyncSession, class_id: int) -> Optional[Dict]:
+    # Özet tablosunda bu sınıfa ait satır yoksa ham tablodan toplanır: moods'a
+    # uygulama dışından yazılmış ve rebuild_rollups henüz çalışmamış olabilir.
+    # Veri olan sınıflarda ek sorgu yoktur
+    summary = summarize((await db.execute(class_totals_stmt(class_id))).all())
+    if summary is None:
+        summary = summarize((await db.execute(_raw_class_totals_stmt(class_id))).all())
+    return summary
+
+
+def summarize(rows) -> Optional[Dict]:
+    # class_totals_stmt (ya da teacher_mood_totals_stmt) satırlarından özet üretir
+    mood_counts = {row.mood: row.entry_count for row in rows if row.entry_count}
+    if not mood_counts:
+        return None
+
+    total_entries = sum(mood_counts.values())
+    score_sum = sum(row.score_sum for row in rows)
+
+    return {
+        "total_entries": total_entries,
+        "average_score": score_sum / total_entries,
+        "mood_distribution": mood_counts,
+        # Eşitlikte alfabetik olarak ilk ruh hali seçilir; satır sırasından bağımsız
+        # olduğu için özet tablosu ve ham tablo yolu aynı sonucu verir
+        "dominant_mood": min(mood_counts, key=lambda mood: (-mood_counts[mood], mood)),
+    }
+
+
+def rebuild_rollups(db) -> int:
+    # Özetleri ham moods satırlarından baştan hesaplar (ör. toplu içe aktarım sonrası).
+    # `db` bir Session ya da Connection olabilir; commit çağırana aittir.
+    MoodEntry = mood_model.MoodEntry
+    base = MoodEntry.class_id.isnot(None), MoodEntry.mood.isnot(None)
+
+    db.execute(delete(ClassMoodTotal))
+    db.execute(delete(ClassMoodDaily))
+
+    db.execute(ClassMoodTotal.__table__.insert().from_select(
+        ["class_id", "mood", "entry_count", "score_sum"],
+        select(
+            MoodEntry.class_id,
+            MoodEntry.mood,
+            func.count(),
+            func.coalesce(func.sum(MoodEntry.score), 0),
+        ).where(*base).group_by(MoodEntry.class_id, MoodEntry.mood),
+    ))
+
+    day = func.date(MoodEntry.timestamp)
+    db.execute(ClassMoodDaily.__table__.insert().from_select(
+        ["class_id", "day", "mood", "entry_count", "score_sum"],
+        select(
+            MoodEntry.class_id,
+            day,
+            MoodEntry.mood,
+            func.count(),
+            func.coalesce(func.sum(MoodEntry.score), 0),
+        ).where(*base, MoodEntry.timestamp.isnot(None)).group_by(MoodEntry.class_id, day, MoodEntry.mood),
+    ))
+
+    return db.scalar(select(func.count()).select_from(MoodEntry))
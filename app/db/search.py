@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# Sunum başlıkları ve sayfa metinleri üzerinde SQLite FTS5 tam metin araması.
+#
+# presentation_search sanal tablosu (rowid = presentations.id) migrations.py
+# tarafından oluşturulur. Başlık satırı presentations üzerindeki tetikleyicilerle
+# eklenir/güncellenir/silinir; sayfa metni (body) PDF işleme bittiğinde yazılır.
+
+import json
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+
+SEARCH_TABLE = "presentation_search"
+
+CREATE_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "title, body, tokenize = 'unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS presentations_search_ai AFTER INSERT ON presentations BEGIN "
+    f"INSERT INTO {SEARCH_TABLE} (rowid, title, body) VALUES (new.id, coalesce(new.title, ''), ''); END",
+    f"CREATE TRIGGER IF NOT EXISTS presentations_search_ad AFTER DELETE ON presentations BEGIN "
+    f"DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS presentations_search_au AFTER UPDATE OF title ON presentations BEGIN "
+    f"UPDATE {SEARCH_TABLE} SET title = coalesce(new.title, '') WHERE rowid = new.id; END",
+]
+
+# Başlık eşleşmeleri sayfa metnindeki eşleşmelerden daha yüksek puanlanır
+_SEARCH_SQL = f"""
+SELECT p.id, p.class_id, p.title, p.file_path, p.page_count,
+       bm25({SEARCH_TABLE}, 10.0, 1.0) AS rank,
+       snippet({SEARCH_TABLE}, 1, '[', ']', '…', 12) AS snippet
+FROM {SEARCH_TABLE}
+JOIN presentations AS p ON p.id = {SEARCH_TABLE}.rowid
+WHERE {SEARCH_TABLE} MATCH :query {{class_filter}}
+ORDER BY rank
+LIMIT :limit OFFSET :offset
+"""
+
+
+def fts_query(raw: str) -> Optional[str]:
+    # Kullanıcı girdisi FTS5 sözdizimi olarak yorumlanmasın diye her kelime
+    # tırnaklanır; son kelime ön ek olarak aranır ("veri yap" -> "veri" "yap"*)
+    words = re.findall(r"\w+", raw)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_stmt(class_id: Optional[int]):
+    class_filter = "AND p.class_id = :class_id" if class_id is not None else ""
+    return text(_SEARCH_SQL.format(class_filter=class_filter))
+
+
+def set_body_stmt():
+    return text(f"UPDATE {SEARCH_TABLE} SET body = :body WHERE rowid = :id")
+
+
+def pages_to_body(pages: List[str]) -> str:
+    return "\n".join(pages)
+
+
+def load_body(text_path: str) -> str:
+    with open(text_path, encoding="utf-8") as f:
+        return pages_to_body(json.load(f))
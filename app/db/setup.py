@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+# Uygulama açılışında şema kurulumu (create_all + geçişler).
+#
+# Import sırasında değil, lifespan başlangıcında bir kez çalışır. Şema zaten son
+# sürümdeyse (PRAGMA user_version) tek bir okuma ile geçilir. Değilse aynı
+# veritabanını kullanan worker'lar bir dosya kilidiyle sıraya girer; kilidi ilk
+# alan kurulumu yapar, diğerleri kilit açılınca işin bittiğini görür.
+# Bu yüzden şemaya yapılan her değişiklik bir geçişle (MIGRATIONS) gelmelidir.
+
+import os
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy.engine import Engine
+
+from app.db.database import Base
+from app.db.migrations import MIGRATIONS, current_version, run_migrations
+from app.models import mood, mood_rollup, presentation, user  # noqa: F401 (create_all için)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0]
+
+
+def schema_is_current(engine: Engine) -> bool:
+    return current_version(engine) >= latest_version()
+
+
+def _lock_path(engine: Engine) -> Optional[str]:
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:":
+        return None
+    return os.path.abspath(database) + ".setup.lock"
+
+
+@contextmanager
+def _file_lock(path: Optional[str]) -> Iterator[None]:
+    if path is None:
+        yield
+        return
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK ~10 sn denedikten sonra vazgeçer; beklemeye devam et
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def prepare_database(engine: Engine) -> List[int]:
+    # Uygulanan geçiş sürümlerini döndürür (şema güncelse boş liste)
+    if schema_is_current(engine):
+        return []
+
+    with _file_lock(_lock_path(engine)):
+        if schema_is_current(engine):
+            return []
+        Base.metadata.create_all(bind=engine)
+        return run_migrations(engine)
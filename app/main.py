@@ -1,26 +1,96 @@
+import asyncio
+import importlib
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import anyio
 from fastapi import FastAPI
-from app.db.database import Base, engine
 
-# Model dosyaları (yalnızca veritabanı için kullanılır)
-from app.models import user, mood as mood_model, presentation as presentation_model
+from app.db.database import engine, async_engine
+from app.core.security import check_secret_key, shutdown_pool
+from app.core import pdf_pipeline, metrics
+from app.core.config import LAZY_ROUTERS, METRICS_ENABLED, UPLOAD_DIR
+from app.core.responses import FastJSONResponse
+
+# Router modülleri: (modül, önek, etiket). Import, create_app ya da (LAZY_ROUTERS ile) ilk istekte
+ROUTERS = [
+    ("app.routers.auth", "/auth", "Auth"),
+    ("app.routers.mood", "/mood", "Mood"),
+    ("app.routers.presentation", "/presentation", "Presentation"),
+    ("app.routers.files", "/files", "Files"),
+    ("app.routers.stream", "/stream", "Stream"),
+    ("app.routers.chatbot", "/chatbot", "Chatbot"),
+    ("app.routers.export", "/export", "Export"),
+]
+
+
+def _prepare() -> None:
+    # Şema kurulumu dosya kilidi altında bir kez (bkz. app/db/setup.py)
+    from app.db.setup import prepare_database
+
+    prepare_database(engine)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_secret_key()
+    await anyio.to_thread.run_sync(_prepare)
+    yield
+    # Süreç havuzlarını ve asenkron bağlantı havuzunu kapat
+    shutdown_pool()
+    pdf_pipeline.shutdown_pool()
+    await async_engine.dispose()
+
+
+def _include_routers(app: FastAPI) -> None:
+    routers = list(ROUTERS)
+    if METRICS_ENABLED:
+        routers.append(("app.routers.metrics", "", "Metrics"))
+    for module_name, prefix, tag in routers:
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, tags=[tag])
+
+
+class LazyRouterMiddleware:
+    # İlk HTTP isteğinde router'ları yükler; sonraki isteklerde yalnızca bir bayrak kontrolü
+    def __init__(self, app, target: FastAPI):
+        self.app = app
+        self.target = target
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if not self.loaded and scope["type"] in ("http", "websocket"):
+            async with self._lock:
+                if not self.loaded:
+                    _include_routers(self.target)
+                    self.loaded = True
+        await self.app(scope, receive, send)
+
 
-# Router dosyaları (FastAPI endpoint'leri için)
-from app.routers import auth, mood as mood_router, presentation as presentation_router
+def create_app(lazy_routers: Optional[bool] = None) -> FastAPI:
+    # Yan etkisiz: veritabanına ve diske lifespan başlangıcına kadar dokunulmaz
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
-app = FastAPI()
+    # İstek metrikleri ve istek başına sorgu sayacı
+    if METRICS_ENABLED:
+        metrics.instrument_engine(engine)
+        metrics.instrument_engine(async_engine.sync_engine)
+        app.add_middleware(metrics.MetricsMiddleware)
 
-# Veritabanı tablolarını oluştur
-Base.metadata.create_all(bind=engine)
+    if LAZY_ROUTERS if lazy_routers is None else lazy_routers:
+        app.add_middleware(LazyRouterMiddleware, target=app)
+    else:
+        _include_routers(app)
 
-# Router'ları ekle
-app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-app.include_router(mood_router.router, prefix="/mood", tags=["Mood"])
-app.include_router(presentation_router.router, prefix="/presentation", tags=["Presentation"])
+    @app.get("/")
+    def read_root():
+        return {"message": "BalanceED Backend is running 🎯"}
 
-@app.get("/")
-def read_root():
-    return {"message": "BalanceED Backend is running 🎯"}
+    return app
 
 
-from app.routers import chatbot
-app.include_router(chatbot.router, prefix="/chatbot", tags=["Chatbot"])
+# uvicorn app.main:app
+app = create_app()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from app.db.database import Base
 from datetime import datetime
 
@@ -11,3 +11,10 @@ class MoodEntry(Base):
     score = Column(Integer)
     mood = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+    # Kullanıcı geçmişi, günlük tekrar kontrolü ve sınıf özetleri bu iki indeksi kullanır.
+    # Mevcut veritabanlarına app/db/migrations.py ile eklenir.
+    __table_args__ = (
+        Index("ix_moods_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_moods_class_id_timestamp", "class_id", "timestamp"),
+    )
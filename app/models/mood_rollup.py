@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Date
+from app.db.database import Base
+
+# Sınıf bazında ruh hali özetleri; moods tablosuna her kayıt eklendiğinde
+# aynı transaction içinde güncellenir (bkz. app/db/rollups.py)
+class ClassMoodTotal(Base):
+    __tablename__ = "class_mood_totals"
+
+    class_id = Column(Integer, primary_key=True)
+    mood = Column(String, primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+
+class ClassMoodDaily(Base):
+    __tablename__ = "class_mood_daily"
+
+    class_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    mood = Column(String, primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
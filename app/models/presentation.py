@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from app.db.database import Base
 from datetime import datetime
 
@@ -10,3 +10,16 @@ class Presentation(Base):
     title = Column(String)
     file_path = Column(String)
     upload_timestamp = Column(DateTime, default=datetime.utcnow)
+    sha256 = Column(String(64), index=True)  # Yükleme sırasında hesaplanan içerik özeti
+    size_bytes = Column(Integer)
+    # Arka plan PDF işleme sonuçları (bkz. app/core/pdf_pipeline.py)
+    processing_status = Column(String, default="pending")  # pending / processing / done / failed
+    page_count = Column(Integer)
+    text_path = Column(String)  # Sayfa metinleri (JSON)
+    thumbnail_path = Column(String)  # İlk sayfa küçük resmi (PNG)
+    processed_at = Column(DateTime)
+
+    # Sınıf listeleri ve "en son sunum" sorguları için
+    __table_args__ = (
+        Index("ix_presentations_class_id_upload_timestamp", "class_id", "upload_timestamp"),
+    )
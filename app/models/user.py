@@ -7,5 +7,5 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True)
     password = Column(String)
-    teacher_id = Column(Integer, nullable=True)  # Yeni eklenen alan
-    class_id = Column(Integer, nullable=True)  # Öğrencinin ait olduğu sınıfı belirtir
+    teacher_id = Column(Integer, nullable=True, index=True)  # Yeni eklenen alan
+    class_id = Column(Integer, nullable=True, index=True)  # Öğrencinin ait olduğu sınıfı belirtir
@@ -1,30 +1,82 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.models import user as user_model
-import bcrypt
+from app.core.security import (
+    hash_password,
+    verify_password,
+    needs_rehash,
+    create_access_token,
+    decode_access_token,
+    password_fingerprint,
+)
+from app.core.cache import TTLCache
+from app.core.config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS, ACCESS_TOKEN_TTL_SECONDS
 from fastapi.security import OAuth2PasswordBearer
+from dataclasses import dataclass
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    user = db.query(user_model.User).filter(user_model.User.username == token).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Geçersiz kullanıcı.")
+# Korunan endpoint'lerin kullandığı, oturumdan bağımsız kullanıcı bilgisi
+@dataclass(frozen=True)
+class CurrentUser:
+    id: int
+    username: str
+    teacher_id: Optional[int]
+    class_id: Optional[int]
+    password_fingerprint: str
+
+    @classmethod
+    def from_model(cls, user: user_model.User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            teacher_id=user.teacher_id,
+            class_id=user.class_id,
+            password_fingerprint=password_fingerprint(user.password),
+        )
+
+# user_id -> CurrentUser; şifre değişince ilgili kayıt silinir
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    credentials_error = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Geçersiz kullanıcı.")
+
+    # İmza ve süre yerel olarak doğrulanır
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_error
+
+    # Kullanıcı kaydı önbellekte yoksa veritabanından bir kez okunur
+    user = user_cache.get(payload["sub"])
+    if user is None:
+        db_user = await db.get(user_model.User, payload["sub"])
+        if not db_user:
+            raise credentials_error
+        user = CurrentUser.from_model(db_user)
+        user_cache.set(user.id, user)
+
+    # Token, şifre değişmeden önce verildiyse geçersizdir
+    if user.password_fingerprint != payload.get("pv"):
+        raise credentials_error
     return user
 
-def teacher_only(current_user: user_model.User = Depends(get_current_user)):
+def teacher_only(current_user: CurrentUser = Depends(get_current_user)):
     if current_user.teacher_id is not None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sadece öğretmenler erişebilir.")
     return current_user
 
-def student_only(current_user: user_model.User = Depends(get_current_user)):
+def student_only(current_user: CurrentUser = Depends(get_current_user)):
     if current_user.teacher_id is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sadece öğrenciler erişebilir.")
     return current_user
@@ -35,21 +87,23 @@ class UserCreate(BaseModel):
     teacher_id: Optional[int] = None
 
 @router.post("/register")
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(user_model.User).filter(user_model.User.username == user_data.username).first()
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = (await db.execute(
+        select(user_model.User.id).where(user_model.User.username == user_data.username)
+    )).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Bu kullanıcı adı zaten var.")
 
-    hashed_password = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt())
+    # bcrypt işi ayrı süreç havuzunda çalışır
+    hashed_password = await hash_password(user_data.password)
 
     new_user = user_model.User(
         username=user_data.username,
-        password=hashed_password.decode('utf-8'),
+        password=hashed_password,
         teacher_id=user_data.teacher_id
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return {
         "message": "Kayıt başarılı!",
@@ -61,22 +115,35 @@ class UserLogin(BaseModel):
     password: str
 
 @router.post("/login")
-def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(user_model.User).filter(user_model.User.username == user_data.username).first()
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(
+        select(user_model.User).where(user_model.User.username == user_data.username)
+    )).scalars().first()
 
-    if not user or not bcrypt.checkpw(user_data.password.encode('utf-8'), user.password.encode('utf-8')):
+    if not user or not await verify_password(user_data.password, user.password):
         raise HTTPException(status_code=401, detail="Geçersiz kullanıcı adı veya şifre.")
 
+    # Maliyet faktörü değiştiyse şifre yeni ayarla yeniden hash'lenir
+    if needs_rehash(user.password):
+        user.password = await hash_password(user_data.password)
+        await db.commit()
+        invalidate_user(user.id)
+
     return {
         "message": "Giriş başarılı!",
         "user_id": user.id,
         "username": user.username,
-        "is_teacher": user.teacher_id is None
+        "is_teacher": user.teacher_id is None,
+        "access_token": create_access_token(user.id, user.password),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS
     }
 
 @router.get("/teacher/{teacher_id}/students", dependencies=[Depends(teacher_only)])
-def get_students_by_teacher(teacher_id: int, db: Session = Depends(get_db)):
-    students = db.query(user_model.User).filter(user_model.User.teacher_id == teacher_id).all()
+async def get_students_by_teacher(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+    students = (await db.execute(
+        select(user_model.User).where(user_model.User.teacher_id == teacher_id)
+    )).scalars().all()
 
     if not students:
         raise HTTPException(status_code=404, detail="Bu öğretmene bağlı öğrenci bulunamadı.")
@@ -90,8 +157,8 @@ def get_students_by_teacher(teacher_id: int, db: Session = Depends(get_db)):
     ]
 
 @router.get("/auth/user-info/{user_id}")
-def get_user_info(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(user_model.User).filter(user_model.User.id == user_id).first()
+async def get_user_info(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(user_model.User, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı.")
@@ -107,27 +174,29 @@ class PasswordUpdateRequest(BaseModel):
     new_password: str
 
 @router.put("/user/{user_id}/update-password")
-def update_user_password(
+async def update_user_password(
     user_id: int,
     password_data: PasswordUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(user_model.User).filter(user_model.User.id == user_id).first()
+    user = await db.get(user_model.User, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı.")
 
-    hashed_password = bcrypt.hashpw(password_data.new_password.encode('utf-8'), bcrypt.gensalt())
-    user.password = hashed_password.decode('utf-8')
+    user.password = await hash_password(password_data.new_password)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    # Önbellekteki kayıt ve eski token'lar geçersiz olur
+    invalidate_user(user.id)
 
     return {"message": "Şifre başarıyla güncellendi."}
 
 @router.get("/class/{class_id}/students", dependencies=[Depends(teacher_only)])
-def get_students_by_class(class_id: int, db: Session = Depends(get_db)):
-    students = db.query(user_model.User).filter(user_model.User.class_id == class_id).all()
+async def get_students_by_class(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    students = (await db.execute(
+        select(user_model.User).where(user_model.User.class_id == class_id)
+    )).scalars().all()
 
     if not students:
         raise HTTPException(status_code=404, detail="Bu sınıfa ait öğrenci bulunamadı.")
@@ -1,15 +1,51 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models import mood as mood_model, user as user_model
-from pydantic import BaseModel
-from collections import Counter
-from typing import List
+from pydantic import BaseModel, Field
+from collections import Counter, OrderedDict
+from typing import Hashable, List, Optional
+from app.core.cache import TTLCache
+from app.core.config import CHATBOT_CACHE_SIZE, CHATBOT_CACHE_TTL_SECONDS, CHATBOT_BATCH_MAX_USERS
+from app.db.queries import latest_entries_stmt
 
 router = APIRouter()
 
+# Hazır yanıt gövdeleri önbelleği: öneri user_id, şablon (user_id, class_id) ile
+suggestion_cache = TTLCache(maxsize=CHATBOT_CACHE_SIZE, ttl=CHATBOT_CACHE_TTL_SECONDS)
+recommendation_cache = TTLCache(maxsize=CHATBOT_CACHE_SIZE, ttl=CHATBOT_CACHE_TTL_SECONDS)
+
+# Kullanıcı başına nesil: her geçersiz kılma kullanıcıya artan sayaçtan yeni bir
+# değer verir. Sorgu başlamadan okunan sayaçtan daha yeni nesli olan kullanıcının
+# sonucu önbelleğe yazılmaz; yoksa sorgu sürerken commit edilen kaydın
+# invalidate'i, hemen ardından gelen eski sonuçla ezilirdi.
+# Nesiller önbellek kadar kullanıcı için tutulur (en eskiler atılır); atılanların en
+# büyüğü taban olur, kaydı olmayan kullanıcı bu tabanla karşılaştırılır (güvenli yön).
+_generations: "OrderedDict[int, int]" = OrderedDict()
+_generation_seq = 0
+_generation_floor = 0
+
+def _current_generation() -> int:
+    return _generation_seq
+
+def _cache_if_fresh(cache: TTLCache, key: Hashable, user_id: int, generation: int, payload: dict) -> None:
+    if _generations.get(user_id, _generation_floor) <= generation:
+        cache.set(key, payload)
+
+def invalidate_chatbot(user_id: int, class_id: int) -> None:
+    # Yeni ruh hali kaydı commit edildikten sonra çağrılır
+    global _generation_seq, _generation_floor
+    _generation_seq += 1
+    _generations[user_id] = _generation_seq
+    _generations.move_to_end(user_id)
+    while len(_generations) > CHATBOT_CACHE_SIZE:
+        _, _generation_floor = _generations.popitem(last=False)
+    suggestion_cache.invalidate(user_id)
+    recommendation_cache.invalidate((user_id, class_id))
+
 # 1️⃣ KİŞİSEL RUH HALİ ÖNERİSİ (Chatbot)
 MOOD_RESPONSES = {
     "Yorgun": "Bugün biraz dinlenmeyi unutma. Yarın yeni bir başlangıç olabilir!",
@@ -20,10 +56,17 @@ MOOD_RESPONSES = {
 }
 
 @router.get("/{user_id}")
-def chatbot_suggestion(user_id: int, db: Session = Depends(get_db)):
-    last_entry = db.query(mood_model.MoodEntry).filter_by(user_id=user_id).order_by(
-        mood_model.MoodEntry.timestamp.desc()
-    ).first()
+async def chatbot_suggestion(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    cached = suggestion_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    generation = _current_generation()
+    last_entry = (await db.execute(
+        select(mood_model.MoodEntry).filter_by(user_id=user_id).order_by(
+            mood_model.MoodEntry.timestamp.desc()
+        ).limit(1)
+    )).scalars().first()
 
     if not last_entry:
         raise HTTPException(status_code=404, detail="Kullanıcının ruh hali kaydı bulunamadı.")
@@ -31,11 +74,13 @@ def chatbot_suggestion(user_id: int, db: Session = Depends(get_db)):
     mood = last_entry.mood
     response = MOOD_RESPONSES.get(mood, "Bugünün nasıl geçtiğini düşünmek için güzel bir an.")
 
-    return {
+    payload = {
         "user_id": user_id,
         "mood": mood,
         "suggestion": response
     }
+    _cache_if_fresh(suggestion_cache, user_id, user_id, generation, payload)
+    return payload
 
 # 2️⃣ YENİ: SUNUM ÖNERİ ŞABLONU (template + not + bölümler)
 class ChatbotRequest(BaseModel):
@@ -59,11 +104,19 @@ TEMPLATE_SECTIONS = {
 }
 
 @router.post("/recommend")
-def get_chatbot_recommendation(request: ChatbotRequest, db: Session = Depends(get_db)):
-    latest_entry = db.query(mood_model.MoodEntry).filter(
-        mood_model.MoodEntry.user_id == request.user_id,
-        mood_model.MoodEntry.class_id == request.class_id
-    ).order_by(mood_model.MoodEntry.timestamp.desc()).first()
+async def get_chatbot_recommendation(request: ChatbotRequest, db: AsyncSession = Depends(get_async_db)):
+    key = (request.user_id, request.class_id)
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = _current_generation()
+    latest_entry = (await db.execute(
+        select(mood_model.MoodEntry).where(
+            mood_model.MoodEntry.user_id == request.user_id,
+            mood_model.MoodEntry.class_id == request.class_id
+        ).order_by(mood_model.MoodEntry.timestamp.desc()).limit(1)
+    )).scalars().first()
 
     if not latest_entry:
         raise HTTPException(status_code=404, detail="Kullanıcının ruh hali verisi bulunamadı.")
@@ -72,10 +125,14 @@ def get_chatbot_recommendation(request: ChatbotRequest, db: Session = Depends(ge
     if mood not in MOOD_TEMPLATE_MAP:
         raise HTTPException(status_code=400, detail="Geçersiz ruh hali verisi.")
 
-    template_key, note = MOOD_TEMPLATE_MAP[mood]
+    payload = _recommendation_payload(request.user_id, mood)
+    _cache_if_fresh(recommendation_cache, key, request.user_id, generation, payload)
+    return payload
 
+def _recommendation_payload(user_id: int, mood: str) -> dict:
+    template_key, note = MOOD_TEMPLATE_MAP[mood]
     return {
-        "user_id": request.user_id,
+        "user_id": user_id,
         "mood": mood,
         "recommendation": {
             "template": template_key,
@@ -83,3 +140,51 @@ def get_chatbot_recommendation(request: ChatbotRequest, db: Session = Depends(ge
             "note": note
         }
     }
+
+# 3️⃣ TOPLU ÖNERİ: sınıfın (ya da verilen öğrencilerin) tamamı için tek istek, tek sorgu
+class ChatbotBatchRequest(BaseModel):
+    class_id: Optional[int] = None
+    user_ids: Optional[List[int]] = Field(default=None, max_length=CHATBOT_BATCH_MAX_USERS)
+
+@router.post("/recommend/batch")
+async def get_chatbot_recommendations_batch(request: ChatbotBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    # Boş liste verilmemiş sayılır (aksi hâlde sorgu IN () ile hiçbir şey döndürmez)
+    user_ids = request.user_ids or None
+    if request.class_id is None and user_ids is None:
+        raise HTTPException(status_code=400, detail="class_id ya da user_ids verilmelidir.")
+
+    generation = _current_generation()
+    rows = (await db.execute(latest_entries_stmt(request.class_id, user_ids))).all()
+
+    students = []
+    for row in rows:
+        if row.mood not in MOOD_TEMPLATE_MAP:
+            continue
+        payload = _recommendation_payload(row.user_id, row.mood)
+        students.append(payload)
+        if request.class_id is not None:
+            # Tekil /recommend çağrıları için önbelleği de ısıt
+            _cache_if_fresh(recommendation_cache, (row.user_id, request.class_id), row.user_id, generation, payload)
+
+    found = {student["user_id"] for student in students}
+    missing = [user_id for user_id in user_ids or [] if user_id not in found]
+
+    if not students:
+        raise HTTPException(status_code=404, detail="Bu sınıf için ruh hali verisi bulunamadı.")
+
+    return {
+        "class_id": request.class_id,
+        "students": students,
+        "missing_user_ids": missing,
+        "template_distribution": dict(Counter(
+            student["recommendation"]["template"] for student in students
+        ))
+    }
+
+# Önbellek isabet/ıska sayaçları
+@router.get("/cache/stats")
+async def chatbot_cache_stats():
+    return {
+        "suggestion": suggestion_cache.stats(),
+        "recommendation": recommendation_cache.stats()
+    }
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# Ruh hali kayıtlarının toplu dışa aktarımı (sınıf ya da öğretmen bazında).
+#
+# Satırlar sunucu tarafı imleçle (yield_per) EXPORT_BATCH_SIZE'lık parçalar hâlinde
+# okunur; her parça hemen CSV, NDJSON, Parquet (parça başına bir row group) ya da
+# Arrow IPC akışı olarak istemciye yazılır. Bellek kullanımı toplam satır
+# sayısından bağımsızdır. Parquet/Arrow için pyarrow gerekir (isteğe bağlı).
+
+import csv
+import io
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import EXPORT_BATCH_SIZE
+from app.core.responses import dumps
+from app.db.database import AsyncSessionLocal, get_async_db
+from app.db.queries import mood_export_stmt
+from app.models import user as user_model
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "ndjson", "parquet", "arrow"]
+
+COLUMNS = ("id", "user_id", "username", "class_id", "score", "mood", "timestamp")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+@lru_cache(maxsize=None)
+def _pyarrow():
+    # İlk Parquet/Arrow isteğinde yüklenir; uygulama açılışını yavaşlatmaz
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class _ChunkSink(io.RawIOBase):
+    # pyarrow yazıcılarının hedefi: yazılanlar her parçadan sonra boşaltılır.
+    # Parquet altbilgisi ofsetleri tell() ile hesaplar; konum boşaltmada sıfırlanmaz
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _partitions(stmt) -> AsyncIterator[list]:
+    # Akış boyunca kendi oturumu; istek bağımlılığındaki oturuma bağlı kalmaz
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+
+async def _csv(partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    async for rows in partitions:
+        writer.writerows(
+            (row.id, row.user_id, row.username, row.class_id, row.score, row.mood,
+             row.timestamp.isoformat() if row.timestamp else None)
+            for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _ndjson(partitions):
+    async for rows in partitions:
+        yield b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def _schema(pa):
+    return pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("username", pa.string()),
+        ("class_id", pa.int64()),
+        ("score", pa.int64()),
+        ("mood", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+    ])
+
+
+def _record_batch(pa, schema, rows):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+async def _parquet(partitions):
+    pa = _pyarrow()
+    schema = _schema(pa)
+    sink = _ChunkSink()
+    with pa.parquet.ParquetWriter(sink, schema) as writer:
+        async for rows in partitions:
+            writer.write_batch(_record_batch(pa, schema, rows))
+            yield sink.drain()
+    # Kapanışta yazılan altbilgi (footer)
+    yield sink.drain()
+
+
+async def _arrow(partitions):
+    pa = _pyarrow()
+    schema = _schema(pa)
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for rows in partitions:
+            writer.write_batch(_record_batch(pa, schema, rows))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": _csv, "ndjson": _ndjson, "parquet": _parquet, "arrow": _arrow}
+
+
+def _export_response(stmt, fmt: ExportFormat, filename: str) -> StreamingResponse:
+    if fmt in ("parquet", "arrow") and _pyarrow() is None:
+        raise HTTPException(status_code=501, detail="Parquet/Arrow dışa aktarımı için pyarrow kurulu olmalı.")
+
+    return StreamingResponse(
+        ENCODERS[fmt](_partitions(stmt)),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+def _check_range(since: Optional[datetime], until: Optional[datetime]) -> None:
+    if since and until and since > until:
+        raise HTTPException(status_code=400, detail="Başlangıç tarihi bitiş tarihinden sonra olamaz.")
+
+
+@router.get("/class/{class_id}")
+async def export_class_moods(
+    class_id: int,
+    fmt: ExportFormat = Query("csv", alias="format"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    _check_range(since, until)
+    stmt = mood_export_stmt(class_id=class_id, since=since, until=until)
+    return _export_response(stmt, fmt, f"class-{class_id}-moods")
+
+
+@router.get("/teacher/{teacher_id}")
+async def export_teacher_moods(
+    teacher_id: int,
+    fmt: ExportFormat = Query("csv", alias="format"),
+    class_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    _check_range(since, until)
+    students = (await db.execute(
+        select(func.count(user_model.User.id)).where(user_model.User.teacher_id == teacher_id)
+    )).scalar_one()
+    if not students:
+        raise HTTPException(status_code=404, detail="Bu öğretmene ait öğrenci bulunamadı.")
+
+    stmt = mood_export_stmt(teacher_id=teacher_id, class_id=class_id, since=since, until=until)
+    return _export_response(stmt, fmt, f"teacher-{teacher_id}-moods")
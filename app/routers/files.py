@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.models import presentation as presentation_model
+from app.core.file_serving import file_response
+
+router = APIRouter()
+
+# Sunum listelerindeki "download_link" (/files/{file_path}) adresleri.
+# Yalnızca presentations tablosunda kayıtlı dosyalar sunulur.
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def get_presentation_file(file_path: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    presentation = (await db.execute(
+        select(
+            presentation_model.Presentation.file_path,
+            presentation_model.Presentation.sha256,
+            presentation_model.Presentation.size_bytes
+        )
+        .where(presentation_model.Presentation.file_path == file_path)
+        .order_by(presentation_model.Presentation.id.desc())
+        .limit(1)
+    )).first()
+
+    if not presentation:
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı.")
+
+    return await file_response(
+        request, presentation.file_path, presentation.sha256, presentation.size_bytes
+    )
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core import metrics
+from app.core.config import SLOW_QUERY_MS
+from app.db.profiling import slow_query_log
+
+router = APIRouter()
+
+# Prometheus metin biçimi (bkz. app/core/metrics.py)
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Yavaş sorgu günlüğünün en kötü N grubu (BALANCEED_SLOW_QUERY_MS ile açılır)
+@router.get("/metrics/slow-queries")
+async def slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: Literal["total_ms", "max_ms", "count"] = "total_ms"
+):
+    return {
+        "enabled": SLOW_QUERY_MS > 0,
+        "threshold_ms": SLOW_QUERY_MS,
+        "statements": slow_query_log.report(limit, order_by)
+    }
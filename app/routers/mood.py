@@ -1,13 +1,23 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.models import mood as mood_model
-from collections import Counter
+from itertools import groupby
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional, Union
+from datetime import datetime, date
 from app.models import user as user_model
+from app.db.queries import latest_moods_stmt, teacher_mood_entries_stmt, teacher_mood_totals_stmt, same_day_entry_stmt, same_day_entries_stmt
+from app.db.rollups import record_mood_entry, record_mood_entries, class_summary, summarize
+from app.db.pagination import decode_cursor, keyset, split_page
+from app.db.buckets import Bucket, user_bucket_stats_stmt, teacher_bucket_stats_stmt, fold_buckets, bucket_count
+from app.routers.chatbot import invalidate_chatbot
+from app.routers.stream import publish_mood_entries
+from app.core.config import HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE, BULK_SUBMIT_MAX_RECORDS, CHART_MAX_BUCKETS
+from app.core.responses import MessageResponse
 
 
 router = APIRouter()
@@ -18,6 +28,99 @@ class MoodTestInput(BaseModel):
     user_id: int
     class_id: int
 
+# Yanıt şemaları: FastAPI listeleri jsonable_encoder yerine pydantic ile serileştirir
+class MoodSubmitResponse(BaseModel):
+    score: int
+    mood: str
+    message: str
+
+class BulkSubmitResult(BaseModel):
+    index: int
+    status: str
+    score: Optional[int] = None
+    mood: Optional[str] = None
+    message: Optional[str] = None
+
+class BulkSubmitResponse(BaseModel):
+    created: int
+    duplicates: int
+    results: List[BulkSubmitResult]
+
+class ClassSummaryResponse(BaseModel):
+    class_id: int
+    average_score: float
+    mood_distribution: Dict[str, int]
+    suggested_template: str
+
+class ClassRecommendationResponse(BaseModel):
+    most_common_mood: str
+    recommendation: str
+
+class ClassMoodSummary(BaseModel):
+    class_id: int
+    total_entries: int
+    mood_distribution: Dict[str, int]
+    most_common_mood: str
+
+class MoodPoint(BaseModel):
+    timestamp: datetime
+    score: Optional[int]
+    mood: Optional[str]
+
+class MoodHistoryPage(BaseModel):
+    items: List[MoodPoint]
+    next_cursor: Optional[str]
+
+class MoodChartPage(BaseModel):
+    user_id: int
+    mood_data: List[MoodPoint]
+    next_cursor: Optional[str]
+
+class UserChartData(BaseModel):
+    user_id: int
+    labels: List[str]
+    scores: List[Optional[int]]
+    moods: List[Optional[str]]
+    next_cursor: Optional[str]
+
+class BucketSeries(BaseModel):
+    labels: List[str]
+    scores: List[Optional[float]]
+    min_scores: List[Optional[int]]
+    max_scores: List[Optional[int]]
+    moods: List[Optional[str]]
+    counts: List[int]
+
+class UserBucketChartData(BucketSeries):
+    user_id: int
+    bucket: Bucket
+
+class StudentLatestMood(BaseModel):
+    student_id: int
+    username: Optional[str]
+    score: Optional[int]
+    mood: Optional[str]
+    timestamp: datetime
+
+class TeacherClassSummary(BaseModel):
+    teacher_id: int
+    total_students: int
+    total_entries: int
+    average_score: float
+    mood_distribution: Dict[str, int]
+    most_common_mood: str
+
+class StudentChartSeries(BaseModel):
+    student_id: int
+    username: Optional[str]
+    labels: List[str]
+    scores: List[Optional[int]]
+
+class StudentBucketSeries(BucketSeries):
+    student_id: int
+    username: Optional[str]
+    bucket: Bucket
+
 # Skora göre ruh hali belirle
 def calculate_mood(score: int) -> str:
     if score <= 7:
@@ -31,22 +134,14 @@ def calculate_mood(score: int) -> str:
     else:
         return "Enerjik"
 
-from datetime import datetime, date
-from sqlalchemy import and_
-
-@router.post("/submit")
-def submit_mood_test(test_data: MoodTestInput, db: Session = Depends(get_db)):
+@router.post("/submit", response_model=MoodSubmitResponse)
+async def submit_mood_test(test_data: MoodTestInput, db: AsyncSession = Depends(get_async_db)):
     today = date.today()
 
     # Aynı gün içinde aynı kullanıcı ve sınıf için daha önce test yapılmış mı kontrol et
-    existing = db.query(mood_model.MoodEntry).filter(
-        and_(
-            mood_model.MoodEntry.user_id == test_data.user_id,
-            mood_model.MoodEntry.class_id == test_data.class_id,
-            mood_model.MoodEntry.timestamp >= datetime.combine(today, datetime.min.time()),
-            mood_model.MoodEntry.timestamp <= datetime.combine(today, datetime.max.time())
-        )
-    ).first()
+    existing = (await db.execute(
+        same_day_entry_stmt(test_data.user_id, test_data.class_id, today)
+    )).first()
 
     if existing:
         raise HTTPException(status_code=400, detail="Bugün bu test zaten gönderilmiş.")
@@ -59,11 +154,22 @@ def submit_mood_test(test_data: MoodTestInput, db: Session = Depends(get_db)):
         user_id=test_data.user_id,
         class_id=test_data.class_id,
         score=score,
-        mood=mood
+        mood=mood,
+        timestamp=datetime.utcnow()
     )
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    # Sınıf özetleri kayıtla aynı transaction içinde güncellenir
+    await record_mood_entry(db, test_data.class_id, mood, score, entry.timestamp)
+    await db.commit()
+    invalidate_chatbot(test_data.user_id, test_data.class_id)
+    # Canlı panolara delta gönder
+    await publish_mood_entries(db, [{
+        "user_id": test_data.user_id,
+        "class_id": test_data.class_id,
+        "score": score,
+        "mood": mood,
+        "timestamp": entry.timestamp
+    }])
 
     return {
         "score": score,
@@ -72,20 +178,70 @@ def submit_mood_test(test_data: MoodTestInput, db: Session = Depends(get_db)):
     }
 
 
+@router.post("/submit/bulk", response_model=BulkSubmitResponse, response_model_exclude_none=True)
+async def submit_mood_tests_bulk(records: List[MoodTestInput], db: AsyncSession = Depends(get_async_db)):
+    if len(records) > BULK_SUBMIT_MAX_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Tek istekte en fazla {BULK_SUBMIT_MAX_RECORDS} kayıt gönderilebilir."
+        )
+
+    today = date.today()
+    now = datetime.utcnow()
+
+    # Batch'in tamamı için günlük tekrar kontrolü tek sorguda yapılır
+    seen = set()
+    if records:
+        seen = set((await db.execute(
+            same_day_entries_stmt((record.class_id for record in records), today)
+        )).all())
+
+    results = []
+    rows = []
+    for index, record in enumerate(records):
+        key = (record.user_id, record.class_id)
+        if key in seen:
+            # Veritabanında ya da aynı batch'te daha önce gelmiş kayıt
+            results.append({"index": index, "status": "duplicate", "message": "Bugün bu test zaten gönderilmiş."})
+            continue
+        seen.add(key)
+
+        score = sum(record.answers)
+        mood = calculate_mood(score)
+        rows.append({
+            "user_id": record.user_id,
+            "class_id": record.class_id,
+            "score": score,
+            "mood": mood,
+            "timestamp": now
+        })
+        results.append({"index": index, "status": "created", "score": score, "mood": mood})
+
+    if rows:
+        # Tek executemany + özet güncellemesi, tek transaction
+        await db.execute(mood_model.MoodEntry.__table__.insert(), rows)
+        await record_mood_entries(db, rows)
+        await db.commit()
+        for row in rows:
+            invalidate_chatbot(row["user_id"], row["class_id"])
+        await publish_mood_entries(db, rows)
+
+    return {
+        "created": len(rows),
+        "duplicates": len(records) - len(rows),
+        "results": results
+    }
+
+
 # 2️⃣ Sınıfa özel özet + şablon önerisi
-@router.get("/class/{class_id}/summary")
-def get_class_summary(class_id: int, db: Session = Depends(get_db)):
-    entries = db.query(mood_model.MoodEntry).filter(mood_model.MoodEntry.class_id == class_id).all()
+@router.get("/class/{class_id}/summary", response_model=ClassSummaryResponse)
+async def get_class_summary(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    summary = await class_summary(db, class_id)
 
-    if not entries:
+    if not summary:
         raise HTTPException(status_code=404, detail="Bu sınıf için veri bulunamadı.")
 
-    scores = [e.score for e in entries]
-    moods = [e.mood for e in entries]
-
-    avg_score = sum(scores) / len(scores)
-    mood_counts = dict(Counter(moods))
-    dominant = max(mood_counts, key=mood_counts.get)
+    dominant = summary["dominant_mood"]
 
     template = {
         "Yorgun": "relax_focus",
@@ -94,21 +250,20 @@ def get_class_summary(class_id: int, db: Session = Depends(get_db)):
 
     return {
         "class_id": class_id,
-        "average_score": round(avg_score, 2),
-        "mood_distribution": mood_counts,
+        "average_score": round(summary["average_score"], 2),
+        "mood_distribution": summary["mood_distribution"],
         "suggested_template": template
     }
 
 # 3️⃣ Ruh hali önerisi
-@router.get("/class/{class_id}/recommendation")
-def get_recommendation_for_class(class_id: int, db: Session = Depends(get_db)):
-    entries = db.query(mood_model.MoodEntry).filter(mood_model.MoodEntry.class_id == class_id).all()
+@router.get("/class/{class_id}/recommendation", response_model=ClassRecommendationResponse)
+async def get_recommendation_for_class(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    summary = await class_summary(db, class_id)
 
-    if not entries:
+    if not summary:
         raise HTTPException(status_code=404, detail="Bu sınıf için ruh hali verisi bulunamadı.")
 
-    mood_counts = Counter([e.mood for e in entries])
-    common_mood = max(mood_counts, key=mood_counts.get)
+    common_mood = summary["dominant_mood"]
 
     recommendations = {
         "Yorgun": "Daha dinlendirici, sakin bir içerik önerilir.",
@@ -124,53 +279,99 @@ def get_recommendation_for_class(class_id: int, db: Session = Depends(get_db)):
     }
 
 # 4️⃣ Yalnızca sınıf özeti (şablonsuz)
-@router.get("/class-summary/{class_id}")
-def get_class_mood_summary(class_id: int, db: Session = Depends(get_db)):
-    entries = db.query(mood_model.MoodEntry).filter(mood_model.MoodEntry.class_id == class_id).all()
+@router.get("/class-summary/{class_id}", response_model=Union[ClassMoodSummary, MessageResponse])
+async def get_class_mood_summary(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    summary = await class_summary(db, class_id)
 
-    if not entries:
+    if not summary:
         return {"message": "Bu sınıf için henüz veri yok."}
 
-    mood_counts = Counter([e.mood for e in entries])
-    common_mood = max(mood_counts, key=mood_counts.get)
-
     return {
         "class_id": class_id,
-        "total_entries": len(entries),
-        "mood_distribution": dict(mood_counts),
-        "most_common_mood": common_mood
+        "total_entries": summary["total_entries"],
+        "mood_distribution": summary["mood_distribution"],
+        "most_common_mood": summary["dominant_mood"]
     }
 
-@router.get("/history/{user_id}")
-def get_user_mood_history(user_id: int, db: Session = Depends(get_db)):
-    entries = db.query(mood_model.MoodEntry).filter(
-        mood_model.MoodEntry.user_id == user_id
-    ).order_by(mood_model.MoodEntry.timestamp.desc()).all()
+# Geçmiş endpoint'leri için ortak sayfalama parametreleri
+def _page_params(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci.")
+    return limit, after
+
+# Düz liste dönen geçmiş endpoint'leri: limit ve cursor verilmezse eski yanıt biçimi
+# (liste) korunur, ancak en fazla HISTORY_MAX_PAGE_SIZE kayıt döner; devamı varsa
+# imleç X-Next-Cursor başlığında verilir. En az biri verilirse {items, next_cursor}
+def _list_page_params(
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    envelope = limit is not None or cursor is not None
+    if limit is None:
+        limit = HISTORY_PAGE_SIZE if envelope else HISTORY_MAX_PAGE_SIZE
+    return _page_params(limit, cursor) + (envelope,)
+
+def _history_response(response: Response, items: list, next_cursor: Optional[str], envelope: bool):
+    if envelope:
+        return {"items": items, "next_cursor": next_cursor}
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+async def _history_page(db: AsyncSession, user_id: int, limit: int, after, newest_first: bool):
+    MoodEntry = mood_model.MoodEntry
+    stmt = keyset(
+        select(MoodEntry.id, MoodEntry.timestamp, MoodEntry.score, MoodEntry.mood).where(
+            MoodEntry.user_id == user_id
+        ),
+        MoodEntry.timestamp, MoodEntry.id, after, limit, newest_first
+    )
+    rows = (await db.execute(stmt)).all()
+    return split_page(rows, limit)
+
+@router.get("/history/{user_id}", response_model=Union[List[MoodPoint], MoodHistoryPage])
+async def get_user_mood_history(
+    user_id: int,
+    response: Response,
+    page: tuple = Depends(_list_page_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    limit, after, envelope = page
+    entries, next_cursor = await _history_page(db, user_id, limit, after, newest_first=True)
 
-    if not entries:
+    if not entries and after is None:
         raise HTTPException(status_code=404, detail="Bu kullanıcıya ait geçmiş veri bulunamadı.")
 
-    return [
+    items = [
         {
-            "timestamp": entry.timestamp.isoformat(),
+            "timestamp": entry.timestamp,
             "score": entry.score,
             "mood": entry.mood
         }
         for entry in entries
     ]
+    return _history_response(response, items, next_cursor, envelope)
 
-@router.get("/mood-history/{user_id}/chart")
-def get_mood_chart_data(user_id: int, db: Session = Depends(get_db)):
-    entries = db.query(mood_model.MoodEntry).filter(
-        mood_model.MoodEntry.user_id == user_id
-    ).order_by(mood_model.MoodEntry.timestamp.asc()).all()
+@router.get("/mood-history/{user_id}/chart", response_model=MoodChartPage)
+async def get_mood_chart_data(
+    user_id: int,
+    page: tuple = Depends(_page_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    limit, after = page
+    entries, next_cursor = await _history_page(db, user_id, limit, after, newest_first=False)
 
-    if not entries:
+    if not entries and after is None:
         raise HTTPException(status_code=404, detail="Kullanıcının ruh hali geçmişi bulunamadı.")
 
     mood_data = [
         {
-            "timestamp": entry.timestamp.isoformat(),
+            "timestamp": entry.timestamp,
             "score": entry.score,
             "mood": entry.mood
         }
@@ -179,105 +380,101 @@ def get_mood_chart_data(user_id: int, db: Session = Depends(get_db)):
 
     return {
         "user_id": user_id,
-        "mood_data": mood_data
+        "mood_data": mood_data,
+        "next_cursor": next_cursor
     }
 
-@router.get("/user/{user_id}/chart-data")
-def get_user_mood_chart_data(user_id: int, db: Session = Depends(get_db)):
-    entries = db.query(mood_model.MoodEntry).filter(
-        mood_model.MoodEntry.user_id == user_id
-    ).order_by(mood_model.MoodEntry.timestamp).all()
+@router.get("/user/{user_id}/chart-data", response_model=Union[UserChartData, UserBucketChartData])
+async def get_user_mood_chart_data(
+    user_id: int,
+    bucket: Optional[Bucket] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    page: tuple = Depends(_page_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if bucket:
+        # Kovalı mod: SQL'de toplanır, boş kovalar doldurulur; sayfalama gerekmez
+        rows = (await db.execute(user_bucket_stats_stmt(user_id, bucket, since, until))).all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="Bu kullanıcı için ruh hali geçmişi bulunamadı.")
 
-    if not entries:
+        start, end = _bucket_range(bucket, since, until, rows)
+        series = fold_buckets(rows, bucket, start, end)
+        return UserBucketChartData(user_id=user_id, bucket=bucket, **series)
+
+    limit, after = page
+    entries, next_cursor = await _history_page(db, user_id, limit, after, newest_first=False)
+
+    if not entries and after is None:
         raise HTTPException(status_code=404, detail="Bu kullanıcı için ruh hali geçmişi bulunamadı.")
 
     labels = [entry.timestamp.strftime("%Y-%m-%d") for entry in entries]
     scores = [entry.score for entry in entries]
     moods = [entry.mood for entry in entries]
 
-    return {
-        "user_id": user_id,
-        "labels": labels,
-        "scores": scores,
-        "moods": moods
-    }
+    return UserChartData(
+        user_id=user_id,
+        labels=labels,
+        scores=scores,
+        moods=moods,
+        next_cursor=next_cursor
+    )
 
-@router.get("/history/{user_id}")
-def get_user_mood_history(
-    user_id: int,
-    current_user_id: int,  # Gerçek sistemde JWT token ile alınır
-    db: Session = Depends(get_db)
+@router.get("/teacher/{teacher_id}/student-latest-moods", response_model=List[StudentLatestMood])
+async def get_teacher_students_latest_moods(
+    teacher_id: int,
+    class_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Erişim kontrolü
-    if user_id != current_user_id:
-        raise HTTPException(status_code=403, detail="Başka bir kullanıcının verisine erişim izniniz yok.")
-
-    entries = db.query(mood_model.MoodEntry).filter(mood_model.MoodEntry.user_id == user_id).all()
+    # Tüm öğrencilerin son ruh hali tek sorguda alınır (öğrenci başına sorgu yok)
+    rows = (await db.execute(latest_moods_stmt(teacher_id, class_id))).all()
 
-    if not entries:
-        return {"message": "Henüz ruh hali kaydınız bulunmamaktadır."}
+    if not rows:
+        raise HTTPException(status_code=404, detail="Bu öğretmene bağlı öğrenci bulunamadı.")
 
     return [
         {
-            "timestamp": entry.timestamp,
-            "score": entry.score,
-            "mood": entry.mood
+            "student_id": row.id,
+            "username": row.username,
+            "score": row.score,
+            "mood": row.mood,
+            "timestamp": row.timestamp
         }
-        for entry in entries
+        for row in rows
+        if row.timestamp is not None
     ]
 
-@router.get("/teacher/{teacher_id}/student-latest-moods")
-def get_teacher_students_latest_moods(teacher_id: int, db: Session = Depends(get_db)):
-    from app.models import user as user_model
-
-    # Bu öğretmene bağlı tüm öğrencileri bul
-    students = db.query(user_model.User).filter(user_model.User.teacher_id == teacher_id).all()
-
-    if not students:
-        raise HTTPException(status_code=404, detail="Bu öğretmene bağlı öğrenci bulunamadı.")
-
-    results = []
-    for student in students:
-        latest_entry = db.query(mood_model.MoodEntry).filter(
-            mood_model.MoodEntry.user_id == student.id
-        ).order_by(mood_model.MoodEntry.timestamp.desc()).first()
-
-        if latest_entry:
-            results.append({
-                "student_id": student.id,
-                "username": student.username,
-                "score": latest_entry.score,
-                "mood": latest_entry.mood,
-                "timestamp": latest_entry.timestamp
-            })
-
-    return results
-
-@router.get("/teacher/{teacher_id}/student/{student_id}/history")
-def get_student_history_by_teacher(
+@router.get(
+    "/teacher/{teacher_id}/student/{student_id}/history",
+    response_model=Union[List[MoodPoint], MoodHistoryPage]
+)
+async def get_student_history_by_teacher(
     teacher_id: int,
     student_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    page: tuple = Depends(_list_page_params),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Önce öğrencinin bu öğretmene bağlı olup olmadığını kontrol et
-    from app.models import user as user_model
-    student = db.query(user_model.User).filter(
-        user_model.User.id == student_id,
-        user_model.User.teacher_id == teacher_id
-    ).first()
+    student = (await db.execute(
+        select(user_model.User.id).where(
+            user_model.User.id == student_id,
+            user_model.User.teacher_id == teacher_id
+        )
+    )).first()
 
     if not student:
         raise HTTPException(status_code=404, detail="Öğretmene bağlı böyle bir öğrenci bulunamadı.")
 
-    # Öğrencinin mood geçmişi
-    history = db.query(mood_model.MoodEntry).filter(
-        mood_model.MoodEntry.user_id == student_id
-    ).order_by(mood_model.MoodEntry.timestamp.desc()).all()
+    # Öğrencinin mood geçmişi (sayfalı)
+    limit, after, envelope = page
+    history, next_cursor = await _history_page(db, student_id, limit, after, newest_first=True)
 
-    if not history:
+    if not history and after is None:
         raise HTTPException(status_code=404, detail="Bu öğrenciye ait geçmiş veri bulunamadı.")
 
-    return [
+    items = [
         {
             "timestamp": entry.timestamp,
             "score": entry.score,
@@ -285,94 +482,94 @@ def get_student_history_by_teacher(
         }
         for entry in history
     ]
-
-@router.get("/teacher/{teacher_id}/class-summary")
-def get_teacher_class_mood_summary(teacher_id: int, db: Session = Depends(get_db)):
-    # Öğretmene ait öğrencileri bul
-    students = db.query(user_model.User).filter(user_model.User.teacher_id == teacher_id).all()
-    if not students:
+    return _history_response(response, items, next_cursor, envelope)
+
+@router.get("/teacher/{teacher_id}/class-summary", response_model=Union[TeacherClassSummary, MessageResponse])
+async def get_teacher_class_mood_summary(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Öğretmene ait öğrenci sayısı (ORM nesnesi yüklemeden)
+    total_students = (await db.execute(
+        select(func.count(user_model.User.id)).where(user_model.User.teacher_id == teacher_id)
+    )).scalar_one()
+    if not total_students:
         raise HTTPException(status_code=404, detail="Bu öğretmene ait öğrenci bulunamadı.")
 
-    student_ids = [s.id for s in students]
-
-    # Öğrencilerin tüm mood girişlerini al
-    mood_entries = db.query(mood_model.MoodEntry).filter(mood_model.MoodEntry.user_id.in_(student_ids)).all()
-    if not mood_entries:
+    # Öğrencilerin girişleri SQL'de ruh haline göre toplanır
+    summary = summarize((await db.execute(teacher_mood_totals_stmt(teacher_id))).all())
+    if not summary:
         return {"message": "Henüz bu sınıfa ait ruh hali verisi girilmedi."}
 
-    # Verileri özetle
-    scores = [e.score for e in mood_entries]
-    moods = [e.mood for e in mood_entries]
-    average_score = round(sum(scores) / len(scores), 2)
-    mood_counts = dict(Counter(moods))
-    most_common_mood = max(mood_counts, key=mood_counts.get)
-
     return {
         "teacher_id": teacher_id,
-        "total_students": len(students),
-        "total_entries": len(mood_entries),
-        "average_score": average_score,
-        "mood_distribution": mood_counts,
-        "most_common_mood": most_common_mood
+        "total_students": total_students,
+        "total_entries": summary["total_entries"],
+        "average_score": round(summary["average_score"], 2),
+        "mood_distribution": summary["mood_distribution"],
+        "most_common_mood": summary["dominant_mood"]
     }
 
-from sqlalchemy import desc
-from app.models import user as user_model  # Eksikse bunu en üste ekle
-
-@router.get("/teacher/{teacher_id}/students-latest-moods")
-def get_students_latest_moods(teacher_id: int, db: Session = Depends(get_db)):
-    # Öğretmenin öğrencilerini bul
-    students = db.query(user_model.User).filter(user_model.User.teacher_id == teacher_id).all()
-    if not students:
+@router.get("/teacher/{teacher_id}/students-latest-moods", response_model=Union[List[StudentLatestMood], MessageResponse])
+async def get_students_latest_moods(
+    teacher_id: int,
+    class_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Öğretmenin öğrencileri ve her birinin son ruh hali tek sorguda
+    rows = (await db.execute(latest_moods_stmt(teacher_id, class_id))).all()
+    if not rows:
         return {"message": "Bu öğretmene ait öğrenci bulunamadı."}
 
-    result = []
-    for student in students:
-        latest_mood = (
-            db.query(mood_model.MoodEntry)
-            .filter(mood_model.MoodEntry.user_id == student.id)
-            .order_by(desc(mood_model.MoodEntry.timestamp))
-            .first()
-        )
-        if latest_mood:
-            result.append({
-                "student_id": student.id,
-                "username": student.username,
-                "mood": latest_mood.mood,
-                "score": latest_mood.score,
-                "timestamp": latest_mood.timestamp
-            })
+    result = [
+        {
+            "student_id": row.id,
+            "username": row.username,
+            "mood": row.mood,
+            "score": row.score,
+            "timestamp": row.timestamp
+        }
+        for row in rows
+        if row.timestamp is not None
+    ]
 
     if not result:
         return {"message": "Öğrencilere ait ruh hali verisi bulunamadı."}
 
     return result
 
-@router.get("/teacher/{teacher_id}/students-mood-chart-data")
-def get_students_mood_chart_data(teacher_id: int, db: Session = Depends(get_db)):
-    from app.models import user as user_model
+@router.get(
+    "/teacher/{teacher_id}/students-mood-chart-data",
+    response_model=Union[List[StudentChartSeries], List[StudentBucketSeries], MessageResponse]
+)
+async def get_students_mood_chart_data(
+    teacher_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: Optional[Bucket] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if bucket:
+        return await _students_bucketed_chart_data(db, teacher_id, bucket, since, until)
 
-    # Öğretmene bağlı tüm öğrencileri bul
-    students = db.query(user_model.User).filter(user_model.User.teacher_id == teacher_id).all()
-    if not students:
+    # Tüm öğrencilerin kayıtları tek sıralı sorguda gelir, tek geçişte gruplanır
+    rows = (await db.execute(teacher_mood_entries_stmt(teacher_id, since, until))).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Bu öğretmene ait öğrenci bulunamadı.")
 
     result = []
-
-    for student in students:
-        entries = db.query(mood_model.MoodEntry).filter(
-            mood_model.MoodEntry.user_id == student.id
-        ).order_by(mood_model.MoodEntry.timestamp.asc()).all()
-
-        if not entries:
+    for (student_id, username), group in groupby(rows, key=lambda row: (row.id, row.username)):
+        labels = []
+        scores = []
+        for row in group:
+            if row.label is None:
+                continue
+            labels.append(row.label)
+            scores.append(row.score)
+
+        if not labels:
             continue
 
-        labels = [entry.timestamp.strftime("%Y-%m-%d") for entry in entries]
-        scores = [entry.score for entry in entries]
-
         result.append({
-            "student_id": student.id,
-            "username": student.username,
+            "student_id": student_id,
+            "username": username,
             "labels": labels,
             "scores": scores
         })
@@ -381,3 +578,33 @@ def get_students_mood_chart_data(teacher_id: int, db: Session = Depends(get_db))
         return {"message": "Öğrencilerin ruh hali verisi bulunamadı."}
 
     return result
+
+def _bucket_range(bucket: Bucket, since, until, rows):
+    # Verilmeyen uç veriden alınır; boş kovalar bu aralıkta doldurulacağı için
+    # kullanıcının verdiği since/until kova sayısıyla sınırlanır
+    start = since.date() if since else date.fromisoformat(min(row.bucket for row in rows))
+    end = until.date() if until else date.fromisoformat(max(row.bucket for row in rows))
+    if bucket_count(bucket, start, end) > CHART_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tarih aralığı en fazla {CHART_MAX_BUCKETS} kova ({bucket}) içerebilir."
+        )
+    return start, end
+
+async def _students_bucketed_chart_data(db: AsyncSession, teacher_id: int, bucket: Bucket, since, until):
+    rows = (await db.execute(teacher_bucket_stats_stmt(teacher_id, bucket, since, until))).all()
+    if not rows:
+        return {"message": "Öğrencilerin ruh hali verisi bulunamadı."}
+
+    # Tüm öğrenciler aynı etiket aralığını paylaşır, grafikte seriler hizalı kalır
+    start, end = _bucket_range(bucket, since, until, rows)
+
+    return [
+        StudentBucketSeries(
+            student_id=student_id,
+            username=username,
+            bucket=bucket,
+            **fold_buckets(list(group), bucket, start, end)
+        )
+        for (student_id, username), group in groupby(rows, key=lambda row: (row.id, row.username))
+    ]
@@ -1,50 +1,202 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.core.config import UPLOAD_DIR, MAX_UPLOAD_BYTES
+from app.core.file_serving import file_response
+from app.core.pdf_pipeline import process_presentation
+from app.core.responses import MessageResponse
+from app.core.uploads import receive_upload, remove_if_exists
+from app.db.catalog import display_name
+from app.db.search import fts_query, search_stmt
+from app.models import presentation as presentation_model, user as user_model
+from fastapi import Query
+from typing import Optional
+import anyio
 import os
-from typing import List
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Union
 
 router = APIRouter()
 
-UPLOAD_DIR = "presentations"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Yanıt şemaları
+class UploadResponse(BaseModel):
+    message: str
+    file_path: str
+    title: str
+    class_id: int
+    size_bytes: int
+    sha256: str
+    presentation_id: int
+    processing_status: str
+
+class SearchHit(BaseModel):
+    presentation_id: int
+    class_id: Optional[int]
+    title: Optional[str]
+    page_count: Optional[int]
+    snippet: Optional[str]
+    score: float
+    download_link: str
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHit]
+    next_offset: Optional[int]
+
+class ClassPresentationFiles(BaseModel):
+    class_id: int
+    presentations: List[str]
+
+class ClassPresentation(BaseModel):
+    title: Optional[str]
+    file_path: Optional[str]
+    upload_timestamp: Optional[datetime]
+
+class LatestPresentation(BaseModel):
+    class_id: int
+    filename: Optional[str]
+    title: Optional[str]
+    timestamp: Optional[datetime]
+
+class StudentPresentation(BaseModel):
+    title: Optional[str]
+    download_link: str
+    uploaded_at: Optional[datetime]
+    page_count: Optional[int]
+    thumbnail_link: Optional[str]
 
-@router.post("/upload")
+# Gövde UploadFile yerine akış hâlinde okunduğu için form şeması dokümana elle eklenir
+UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["class_id", "title", "file"],
+                    "properties": {
+                        "class_id": {"type": "integer"},
+                        "title": {"type": "string"},
+                        "file": {"type": "string", "format": "binary"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+@router.post("/upload", response_model=UploadResponse, openapi_extra=UPLOAD_FORM_SCHEMA)
 async def upload_presentation(
-    class_id: int = Form(...),
-    title: str = Form(...),
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    file_location = f"{UPLOAD_DIR}/{class_id}_{file.filename}"
-    with open(file_location, "wb") as f:
-        f.write(await file.read())
+    # Dosya gövdeden doğrudan geçici dosyaya akıtılır; boyut sınırı okurken uygulanır
+    upload = await receive_upload(request, os.path.join(UPLOAD_DIR, ".tmp"), MAX_UPLOAD_BYTES)
+    try:
+        if upload.filename is None:
+            raise HTTPException(status_code=422, detail="file alanı zorunlu.")
+        # Dosya adındaki dizin bileşenleri atılır (ör. "../")
+        filename = os.path.basename(upload.filename)
+        if not filename:
+            raise HTTPException(status_code=400, detail="Geçersiz dosya adı.")
+        try:
+            class_id = int(upload.fields.get("class_id", ""))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="class_id tam sayı olmalı.")
+        title = upload.fields.get("title")
+        if not title:
+            raise HTTPException(status_code=422, detail="title alanı zorunlu.")
 
-    from app.models import presentation as presentation_model
-    from datetime import datetime
+        # İçerik özeti ada eklenir: aynı adla yeniden yükleme eski kayıtların
+        # dosyasını (ve ETag / önbellek eşleşmesini) ezmez
+        sha256, size_bytes = upload.sha256, upload.size
+        file_location = f"{UPLOAD_DIR}/{class_id}_{sha256[:16]}_{filename}"
+        await anyio.to_thread.run_sync(os.replace, upload.tmp_path, file_location)
+    finally:
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(remove_if_exists, upload.tmp_path)
 
     # Veritabanına kayıt
     new_presentation = presentation_model.Presentation(
         class_id=class_id,
         title=title,
         file_path=file_location,
-        upload_timestamp=datetime.utcnow()
+        upload_timestamp=datetime.utcnow(),
+        sha256=sha256,
+        size_bytes=size_bytes,
+        processing_status="pending"
     )
     db.add(new_presentation)
-    db.commit()
-    db.refresh(new_presentation)
+    await db.commit()
+
+    # Metin çıkarma, sayfa sayısı ve küçük resim yanıt döndükten sonra üretilir
+    background_tasks.add_task(process_presentation, new_presentation.id)
 
     return {
         "message": "Sunum başarıyla yüklendi.",
         "file_path": file_location,
         "title": title,
-        "class_id": class_id
+        "class_id": class_id,
+        "size_bytes": size_bytes,
+        "sha256": sha256,
+        "presentation_id": new_presentation.id,
+        "processing_status": "pending"
     }
 
 
-@router.get("/presentations/{class_id}")
-def list_presentations(class_id: int):
-    files = [f for f in os.listdir(UPLOAD_DIR) if f.startswith(f"{class_id}_")]
+@router.get("/search", response_model=SearchResponse)
+async def search_presentations(
+    q: str = Query(..., min_length=1),
+    class_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = fts_query(q)
+    if query is None:
+        raise HTTPException(status_code=400, detail="Geçerli bir arama ifadesi girin.")
+
+    # Bir fazla satır istenir; varsa sonraki sayfa olduğu anlaşılır
+    rows = (await db.execute(
+        search_stmt(class_id),
+        {"query": query, "class_id": class_id, "limit": limit + 1, "offset": offset}
+    )).all()
+
+    has_more = len(rows) > limit
+    return {
+        "query": q,
+        "results": [
+            {
+                "presentation_id": row.id,
+                "class_id": row.class_id,
+                "title": row.title,
+                "page_count": row.page_count,
+                "snippet": row.snippet,
+                "score": -row.rank,
+                "download_link": f"/files/{row.file_path}"
+            }
+            for row in rows[:limit]
+        ],
+        "next_offset": offset + limit if has_more else None
+    }
+
+
+@router.get("/presentations/{class_id}", response_model=ClassPresentationFiles)
+async def list_presentations(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Dizin taraması yerine indeksli katalog (presentations tablosu) kullanılır;
+    # diske API dışından eklenen/silinen dosyalar `python -m app.cli reconcile-presentations`
+    # ile kataloğa yansıtılır.
+    file_paths = (await db.execute(
+        select(presentation_model.Presentation.file_path)
+        .where(presentation_model.Presentation.class_id == class_id)
+        .order_by(presentation_model.Presentation.upload_timestamp)
+    )).scalars().all()
+
+    # Aynı adla yeniden yüklenen sürümler tek ad olarak listelenir
+    files = list(dict.fromkeys(display_name(path) for path in file_paths))
     return {
         "class_id": class_id,
         "presentations": files
@@ -56,11 +208,14 @@ from typing import List
 from app.models import presentation as presentation_model
 from datetime import datetime
 
-@router.get("/class/{class_id}", response_model=List[dict])
-def get_presentations_for_class(class_id: int, db: Session = Depends(get_db)):
-    presentations = db.query(presentation_model.Presentation).filter(
-        presentation_model.Presentation.class_id == class_id
-    ).all()
+@router.get("/class/{class_id}", response_model=List[ClassPresentation])
+async def get_presentations_for_class(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    Presentation = presentation_model.Presentation
+    presentations = (await db.execute(
+        select(Presentation.title, Presentation.file_path, Presentation.upload_timestamp).where(
+            Presentation.class_id == class_id
+        )
+    )).all()
 
     if not presentations:
         raise HTTPException(status_code=404, detail="Bu sınıf için sunum bulunamadı.")
@@ -77,14 +232,15 @@ def get_presentations_for_class(class_id: int, db: Session = Depends(get_db)):
 
 from sqlalchemy import desc  # en son ekleneni bulmak için
 
-@router.get("/latest/{class_id}")
-def get_latest_presentation(class_id: int, db: Session = Depends(get_db)):
-    latest_presentation = (
-        db.query(presentation_model.Presentation)
-        .filter(presentation_model.Presentation.class_id == class_id)
-        .order_by(presentation_model.Presentation.upload_timestamp.desc())
-        .first()
-    )
+@router.get("/latest/{class_id}", response_model=Union[LatestPresentation, MessageResponse])
+async def get_latest_presentation(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    Presentation = presentation_model.Presentation
+    latest_presentation = (await db.execute(
+        select(Presentation.class_id, Presentation.file_path, Presentation.title, Presentation.upload_timestamp)
+        .where(Presentation.class_id == class_id)
+        .order_by(Presentation.upload_timestamp.desc())
+        .limit(1)
+    )).first()
 
     if not latest_presentation:
         return {"message": "Henüz bu sınıfa ait bir sunum yüklenmedi."}
@@ -93,69 +249,95 @@ def get_latest_presentation(class_id: int, db: Session = Depends(get_db)):
         "class_id": latest_presentation.class_id,
         "filename": latest_presentation.file_path,
         "title": latest_presentation.title,
-        "timestamp": latest_presentation.upload_timestamp.isoformat(),
+        "timestamp": latest_presentation.upload_timestamp,
     }
 
-@router.get("/student/class/{class_id}/presentations")
-def get_presentations_for_student(class_id: int, db: Session = Depends(get_db)):
-    from app.models import presentation as presentation_model
+def _student_presentations_stmt(class_id: int):
+    # Öğrenci listeleri için yalnızca gereken sütunlar (ORM nesnesi yüklenmez)
+    Presentation = presentation_model.Presentation
+    return select(
+        Presentation.id,
+        Presentation.title,
+        Presentation.file_path,
+        Presentation.upload_timestamp,
+        Presentation.page_count,
+        Presentation.thumbnail_path,
+    ).where(Presentation.class_id == class_id)
 
-    presentations = db.query(presentation_model.Presentation).filter(
-        presentation_model.Presentation.class_id == class_id
-    ).all()
+@router.get("/student/class/{class_id}/presentations", response_model=List[StudentPresentation])
+async def get_presentations_for_student(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    presentations = (await db.execute(_student_presentations_stmt(class_id))).all()
 
     return [
         {
             "title": p.title,
             "download_link": f"/files/{p.file_path}",
-            "uploaded_at": p.upload_timestamp
+            "uploaded_at": p.upload_timestamp,
+            "page_count": p.page_count,
+            "thumbnail_link": f"/presentation/{p.id}/thumbnail" if p.thumbnail_path else None
         } for p in presentations
     ]
 
-@router.get("/student/{class_id}/presentations")
-def get_presentations_for_student(class_id: int, db: Session = Depends(get_db)):
-    from app.models import presentation as presentation_model
-
-    presentations = db.query(presentation_model.Presentation).filter(
-        presentation_model.Presentation.class_id == class_id
-    ).all()
+@router.get("/student/{class_id}/presentations", response_model=List[StudentPresentation])
+async def get_presentations_for_student(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    presentations = (await db.execute(_student_presentations_stmt(class_id))).all()
 
     return [
         {
             "title": p.title,
             "download_link": f"/files/{p.file_path}",
-            "uploaded_at": p.upload_timestamp
+            "uploaded_at": p.upload_timestamp,
+            "page_count": p.page_count,
+            "thumbnail_link": f"/presentation/{p.id}/thumbnail" if p.thumbnail_path else None
         } for p in presentations
     ]
 
 @router.get("/student/{student_id}/presentation/{presentation_id}/detail")
-def get_presentation_detail_for_student(student_id: int, presentation_id: int, db: Session = Depends(get_db)):
-    from app.models import user as user_model
-    from app.models import presentation as presentation_model
-
+async def get_presentation_detail_for_student(student_id: int, presentation_id: int, db: AsyncSession = Depends(get_async_db)):
     # Öğrenciyi kontrol et
-    student = db.query(user_model.User).filter(user_model.User.id == student_id).first()
+    student = await db.get(user_model.User, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Öğrenci bulunamadı.")
 
     # Sunumu kontrol et: öğrenci ile aynı sınıfa ait mi
-    presentation = db.query(presentation_model.Presentation).filter(
-        presentation_model.Presentation.id == presentation_id,
-        presentation_model.Presentation.class_id == student.class_id
-    ).first()
+    presentation = (await db.execute(
+        select(presentation_model.Presentation).where(
+            presentation_model.Presentation.id == presentation_id,
+            presentation_model.Presentation.class_id == student.class_id
+        )
+    )).scalars().first()
 
     if not presentation:
         raise HTTPException(status_code=404, detail="Bu sunum bu öğrenciye ait sınıfla eşleşmiyor.")
 
-    # Sunumu yükleyen öğretmeni al
-    teacher = db.query(user_model.User).filter(user_model.User.id == presentation.teacher_id).first()
+    # Sunumda yükleyen bilgisi tutulmaz; öğrencinin öğretmeni gösterilir
+    teacher = await db.get(user_model.User, student.teacher_id) if student.teacher_id else None
     teacher_name = teacher.username if teacher else "Bilinmiyor"
 
     return {
         "presentation_id": presentation.id,
         "title": presentation.title,
-        "description": presentation.description,
+        "description": None,
         "uploaded_at": presentation.upload_timestamp,
         "teacher_name": teacher_name,
         "download_link": f"/files/{presentation.file_path}"
     }
+
+@router.api_route("/{presentation_id}/download", methods=["GET", "HEAD"])
+async def download_presentation(presentation_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    presentation = await db.get(presentation_model.Presentation, presentation_id)
+    if not presentation:
+        raise HTTPException(status_code=404, detail="Sunum bulunamadı.")
+
+    # Range (206), ETag/Last-Modified (304) destekli dosya yanıtı
+    return await file_response(
+        request, presentation.file_path, presentation.sha256, presentation.size_bytes
+    )
+
+@router.api_route("/{presentation_id}/thumbnail", methods=["GET", "HEAD"])
+async def get_presentation_thumbnail(presentation_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    presentation = await db.get(presentation_model.Presentation, presentation_id)
+    if not presentation or not presentation.thumbnail_path:
+        raise HTTPException(status_code=404, detail="Bu sunum için küçük resim bulunamadı.")
+
+    return await file_response(request, presentation.thumbnail_path, media_type="image/png")
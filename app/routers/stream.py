@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+# Öğretmen panoları için canlı ruh hali akışı (Server-Sent Events).
+#
+# Bağlanınca tek bir anlık görüntü (snapshot) gönderilir, sonrasında yalnızca
+# ruh hali gönderimlerinin ürettiği küçük değişiklikler (delta) gelir. Gönderimler
+# arasında veritabanına hiç dokunulmaz.
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Awaitable, Callable, Iterable
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import STREAM_HEARTBEAT_SECONDS, STREAM_QUEUE_SIZE
+from app.core.pubsub import PubSub
+from app.db.database import AsyncSessionLocal
+from app.db.queries import latest_moods_stmt
+from app.db.rollups import class_summary
+from app.models import user as user_model
+
+router = APIRouter()
+
+broker = PubSub(queue_size=STREAM_QUEUE_SIZE)
+
+
+def _class_topic(class_id: int) -> str:
+    return f"class:{class_id}"
+
+
+def _teacher_topic(teacher_id: int) -> str:
+    return f"teacher:{teacher_id}"
+
+
+def _sse(message: dict) -> str:
+    return f"event: {message['type']}\ndata: {json.dumps(message, ensure_ascii=False)}\n\n"
+
+
+def _entry_event(entry: dict) -> dict:
+    return {
+        "user_id": entry["user_id"],
+        "class_id": entry["class_id"],
+        "score": entry["score"],
+        "mood": entry["mood"],
+        "timestamp": entry["timestamp"].isoformat(),
+    }
+
+
+def _class_summary(class_id: int, summary) -> dict:
+    if not summary:
+        return {"class_id": class_id, "total_entries": 0, "mood_distribution": {}}
+    return {
+        "class_id": class_id,
+        "total_entries": summary["total_entries"],
+        "average_score": round(summary["average_score"], 2),
+        "mood_distribution": summary["mood_distribution"],
+        "most_common_mood": summary["dominant_mood"],
+    }
+
+
+def _summary_event(class_id: int, summary) -> dict:
+    return {"type": "summary", **_class_summary(class_id, summary)}
+
+
+async def publish_mood_entries(db: AsyncSession, entries: Iterable[dict]) -> None:
+    # Commit sonrası çağrılır; abonesi olmayan konular için sorgu çalıştırılmaz
+    by_class = defaultdict(list)
+    for entry in entries:
+        by_class[entry["class_id"]].append(entry)
+
+    # Sınıf başına en fazla bir kez hesaplanır; sınıf ve öğretmen kanalları paylaşır
+    summaries = {}
+
+    async def summary_for(class_id: int):
+        if class_id not in summaries:
+            # Özet tablosundan en fazla 5 satır: güncel dağılım
+            summaries[class_id] = await class_summary(db, class_id)
+        return summaries[class_id]
+
+    for class_id, items in by_class.items():
+        topic = _class_topic(class_id)
+        if not broker.has_subscribers(topic):
+            continue
+        summary = await summary_for(class_id)
+        broker.publish(topic, {
+            **_summary_event(class_id, summary),
+            "type": "mood_entries",
+            "entries": [_entry_event(item) for item in items],
+        })
+
+    if not broker.has_prefix("teacher:"):
+        return
+
+    User = user_model.User
+    user_ids = {item["user_id"] for items in by_class.values() for item in items}
+    teachers = dict((await db.execute(
+        select(User.id, User.teacher_id).where(User.id.in_(user_ids), User.teacher_id.isnot(None))
+    )).all())
+
+    by_teacher = defaultdict(list)
+    for items in by_class.values():
+        for item in items:
+            if item["user_id"] in teachers:
+                by_teacher[teachers[item["user_id"]]].append(_entry_event(item))
+
+    for teacher_id, events in by_teacher.items():
+        topic = _teacher_topic(teacher_id)
+        if not broker.has_subscribers(topic):
+            continue
+        # Yeni kayıtlar + etkilenen her sınıfın güncel dağılımı (pano yoklama yapmaz)
+        class_ids = sorted({event["class_id"] for event in events})
+        broker.publish(topic, {
+            "type": "mood_entries",
+            "teacher_id": teacher_id,
+            "entries": events,
+            "summaries": [_class_summary(class_id, await summary_for(class_id)) for class_id in class_ids],
+        })
+
+
+async def _event_stream(request: Request, topic: str, snapshot: Callable[[], Awaitable[dict]]):
+    # Önce abone olunur, sonra anlık görüntü alınır: aradaki gönderimler kaybolmaz
+    with broker.subscribe(topic) as queue:
+        yield _sse(await snapshot())
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            yield _sse(message)
+
+
+def _stream_response(request: Request, topic: str, snapshot) -> StreamingResponse:
+    return StreamingResponse(
+        _event_stream(request, topic, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/class/{class_id}")
+async def stream_class_moods(class_id: int, request: Request):
+    async def snapshot():
+        # Akış boyunca bağlantı tutulmasın diye kısa ömürlü oturum
+        async with AsyncSessionLocal() as db:
+            summary = await class_summary(db, class_id)
+        return _summary_event(class_id, summary)
+
+    return _stream_response(request, _class_topic(class_id), snapshot)
+
+
+@router.get("/teacher/{teacher_id}")
+async def stream_teacher_moods(teacher_id: int, request: Request):
+    async def snapshot():
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(latest_moods_stmt(teacher_id))).all()
+        return {
+            "type": "latest_moods",
+            "teacher_id": teacher_id,
+            "students": [
+                {
+                    "student_id": row.id,
+                    "username": row.username,
+                    "score": row.score,
+                    "mood": row.mood,
+                    "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                }
+                for row in rows
+            ],
+        }
+
+    return _stream_response(request, _teacher_topic(teacher_id), snapshot)
+
+
+@router.get("/stats")
+async def stream_stats():
+    # Konu başına bağlı pano sayısı
+    return broker.stats()
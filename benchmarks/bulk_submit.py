@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# Toplu ruh hali gönderimi kıyası: /mood/submit (kayıt başına istek) ile
+# /mood/submit/bulk (tek istek, tek transaction) arasındaki içe aktarım hızı.
+#
+#   python -m benchmarks.bulk_submit
+#   python -m benchmarks.bulk_submit --records 5000 --batch 1000 --json bulk.json
+#
+# Uygulama geçici bir veritabanıyla süreç içinde (TestClient) çalıştırılır; her yol
+# kendi veritabanını kullanır, böylece günlük tekrar kontrolü birbirini etkilemez.
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import load_app
+
+CLASSES = 40
+
+
+def _records(count):
+    # Her kayıt farklı (user_id, class_id) çifti: tekrar kontrolüne takılmaz
+    return [
+        {
+            "user_id": i + 1,
+            "class_id": i % CLASSES + 1,
+            "answers": [random.randint(1, 5) for _ in range(5)],
+        }
+        for i in range(count)
+    ]
+
+
+def _client(tmp):
+    from fastapi.testclient import TestClient
+
+    return TestClient(load_app(os.path.join(tmp, "bench.db"), os.path.join(tmp, "presentations")))
+
+
+def run_single(records):
+    with tempfile.TemporaryDirectory() as tmp:
+        with _client(tmp) as client:
+            started = time.perf_counter()
+            for record in records:
+                response = client.post("/mood/submit", json=record)
+                assert response.status_code == 200, response.text
+            elapsed = time.perf_counter() - started
+    return {"path": "/mood/submit", "records": len(records), "seconds": elapsed, "records_per_s": len(records) / elapsed}
+
+
+def run_bulk(records, batch):
+    with tempfile.TemporaryDirectory() as tmp:
+        with _client(tmp) as client:
+            started = time.perf_counter()
+            for offset in range(0, len(records), batch):
+                response = client.post("/mood/submit/bulk", json=records[offset:offset + batch])
+                assert response.status_code == 200, response.text
+                assert response.json()["duplicates"] == 0
+            elapsed = time.perf_counter() - started
+    return {
+        "path": f"/mood/submit/bulk (batch={batch})",
+        "records": len(records),
+        "seconds": elapsed,
+        "records_per_s": len(records) / elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bulk_submit")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=1000, help="bulk istek başına kayıt")
+    parser.add_argument("--json", dest="json_path", help="sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args(argv)
+
+    records = _records(args.records)
+    results = [run_single(records), run_bulk(records, args.batch)]
+
+    for result in results:
+        print(f"{result['path']:36s} {result['records']:6d} kayıt  {result['seconds']:7.2f}s  {result['records_per_s']:9.0f} kayıt/s")
+    print(f"hızlanma: {results[1]['records_per_s'] / results[0]['records_per_s']:.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+# Soğuk açılış ölçümü: her deneme yeni bir Python sürecinde çalışır.
+#
+#   python -m benchmarks.cold_start
+#   python -m benchmarks.cold_start --runs 10 --json cold.json
+#
+# Ölçülenler: `import app.main` süresi, lifespan başlangıcı (şema kurulumu) ve ilk
+# isteğin yanıt süresi. Router'lar hemen (eager) ya da ilk istekte (lazy,
+# BALANCEED_LAZY_ROUTERS=1) yüklenir; veritabanı boş (fresh) ya da geçişleri
+# uygulanmış (migrated) olabilir.
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile
+
+FIRST_PATH = "/mood/history/1"
+
+
+def _child():
+    # Alt süreç: ölçümleri stdout'a tek satır JSON olarak yazar
+    started = time.perf_counter()
+    from app.main import app
+
+    imported = time.perf_counter()
+
+    import httpx
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.get(FIRST_PATH)
+            answered = time.perf_counter()
+            # Boş veritabanında 404 beklenir; önemli olan router ve sorgu yolunun ilk kez çalışması
+            assert response.status_code < 500, response.text
+            return ready, answered
+
+    ready, answered = asyncio.run(run())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_response_ms": (answered - ready) * 1000,
+        "total_ms": (answered - started) * 1000,
+    }))
+
+
+def _spawn(db_path, upload_dir, lazy):
+    env = dict(
+        os.environ,
+        BALANCEED_DATABASE_URL=f"sqlite:///{db_path}",
+        BALANCEED_UPLOAD_DIR=upload_dir,
+        BALANCEED_LAZY_ROUTERS="1" if lazy else "0",
+        BALANCEED_DEV_MODE=os.environ.get("BALANCEED_DEV_MODE", "1"),
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_case(tmp, lazy, migrated, runs):
+    samples = []
+    for i in range(runs):
+        db_path = os.path.join(tmp, f"{'lazy' if lazy else 'eager'}-{'migrated' if migrated else 'fresh'}-{i}.db")
+        upload_dir = os.path.join(tmp, "presentations")
+        if migrated:
+            # Şemayı önceden kuran bir açılış; ölçülen açılış hızlı yoldan geçer
+            _spawn(db_path, upload_dir, lazy)
+        samples.append(_spawn(db_path, upload_dir, lazy))
+
+    result = {"routers": "lazy" if lazy else "eager", "db": "migrated" if migrated else "fresh", "runs": runs}
+    for key in ("import_ms", "startup_ms", "first_response_ms", "total_ms"):
+        values = [sample[key] for sample in samples]
+        result[f"{key[:-3]}_p50_ms"] = percentile(values, 50)
+        result[f"{key[:-3]}_max_ms"] = max(values)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BalanceED soğuk açılış ölçümü")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for lazy in (False, True):
+            for migrated in (False, True):
+                result = run_case(tmp, lazy, migrated, args.runs)
+                results.append(result)
+                print(
+                    f"{result['routers']:5} {result['db']:8} import p50 {result['import_p50_ms']:7.1f} ms  "
+                    f"startup p50 {result['startup_p50_ms']:7.1f} ms  "
+                    f"first response p50 {result['first_response_p50_ms']:7.1f} ms  "
+                    f"total p50 {result['total_p50_ms']:7.1f} ms"
+                )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
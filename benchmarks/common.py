@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+# Benchmark betiklerinin ortak yardımcıları.
+
+import os
+import sys
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_app(db_path, upload_dir, **env):
+    # Ayarlar import sırasında okunur; uygulama verilen veritabanına yönlendirilip
+    # (önceden yüklenmiş app modülleri atılarak) yeniden import edilir
+    os.environ["BALANCEED_DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["BALANCEED_UPLOAD_DIR"] = upload_dir
+    # Ölçümler için süreç başına rastgele token anahtarı (bkz. config.DEV_MODE)
+    os.environ.setdefault("BALANCEED_DEV_MODE", "1")
+    for name, value in env.items():
+        os.environ[f"BALANCEED_{name}"] = str(value)
+    for name in [name for name in sys.modules if name == "app" or name.startswith("app.")]:
+        del sys.modules[name]
+
+    from app.main import app
+
+    return app
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+# Benchmark'lar için sentetik veri üretici.
+#
+#   python -m benchmarks.datagen --out bench-data                      # küçük (hızlı) veri
+#   python -m benchmarks.datagen --out bench-data --teachers 50 \
+#       --students 1000 --days 365                                     # tam ölçek (~18M kayıt)
+#
+# <out>/balanceed.db ve <out>/presentations/ oluşturulur. Öğretmen ve öğrencilerin
+# hepsinin şifresi --password ile verilir (kullanıcı adları teacher_<n> / student_<n>).
+# Ruh hali kayıtları dünden geriye doğru --days gün boyunca, zaman sırasıyla yazılır;
+# böylece bugünkü gönderimler tekrar kontrolüne takılmaz. Yazım bitince şema
+# geçişleri çalıştırılır (özet tabloları ve arama indeksi de böyle dolar).
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+from datetime import date, datetime, timedelta
+
+import bcrypt
+
+from app.core.config import BCRYPT_ROUNDS
+from app.db.database import Base, create_db_engine
+from app.db.migrations import run_migrations
+from app.models import mood as mood_model, mood_rollup, presentation as presentation_model, user as user_model  # noqa: F401
+from app.routers.mood import calculate_mood
+
+WORDS = [
+    "matematik", "fizik", "kimya", "biyoloji", "tarih", "coğrafya", "edebiyat", "geometri",
+    "olasılık", "denklem", "hücre", "enerji", "kuvvet", "atom", "osmanlı", "iklim",
+    "şiir", "roman", "fonksiyon", "türev", "integral", "elektrik", "manyetizma", "ekosistem",
+]
+
+# Tek sayfalık, metinsiz en küçük geçerli PDF
+PDF_BYTES = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+# 1x1 PNG (küçük resim uç noktası için)
+PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+CHUNK_ROWS = 50000
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _insert(conn, sql, rows):
+    for offset in range(0, len(rows), CHUNK_ROWS):
+        conn.exec_driver_sql(sql, rows[offset:offset + CHUNK_ROWS])
+
+
+def _users(args, password_hash):
+    teachers = [(i, f"teacher_{i}", password_hash, None, None) for i in range(1, args.teachers + 1)]
+    students = []
+    next_id = args.teachers + 1
+    for teacher_id in range(1, args.teachers + 1):
+        for n in range(args.students):
+            class_id = (teacher_id - 1) * args.classes + n % args.classes + 1
+            students.append((next_id, f"student_{next_id}", password_hash, teacher_id, class_id))
+            next_id += 1
+    return teachers, students
+
+
+def _mood_rows(rng, students, day, fill):
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+    rows = []
+    for user_id, _name, _password, _teacher_id, class_id in students:
+        if rng.random() > fill:
+            continue
+        score = sum(rng.randint(1, 5) for _ in range(5))
+        timestamp = start + timedelta(seconds=rng.randint(0, 9 * 3600))
+        rows.append((user_id, class_id, score, calculate_mood(score), timestamp.isoformat(sep=" ", timespec="microseconds")))
+    rows.sort(key=lambda row: row[4])
+    return rows
+
+
+def _presentations(rng, args, upload_dir):
+    cache_dir = os.path.join(upload_dir, ".cache")
+    thumbnail = os.path.join(cache_dir, "thumbnail.png")
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(thumbnail, "wb") as f:
+        f.write(PNG_BYTES)
+
+    sha256 = hashlib.sha256(PDF_BYTES).hexdigest()
+    uploaded = datetime.utcnow() - timedelta(days=args.days)
+
+    rows = []
+    presentation_id = 1
+    for class_id in range(1, args.teachers * args.classes + 1):
+        for n in range(args.presentations):
+            file_path = os.path.join(upload_dir, f"{class_id}_sunum_{n + 1}.pdf")
+            with open(file_path, "wb") as f:
+                f.write(PDF_BYTES)
+
+            text_path = os.path.join(cache_dir, f"id-{presentation_id}", "pages.json")
+            os.makedirs(os.path.dirname(text_path), exist_ok=True)
+            with open(text_path, "w", encoding="utf-8") as f:
+                json.dump([_sentence(rng, 60) for _ in range(rng.randint(3, 12))], f, ensure_ascii=False)
+
+            timestamp = uploaded + timedelta(hours=presentation_id)
+            rows.append((
+                presentation_id, class_id, _sentence(rng, 4).title(), file_path,
+                timestamp.isoformat(sep=" ", timespec="microseconds"), sha256, len(PDF_BYTES),
+                "done", 1, text_path, thumbnail, timestamp.isoformat(sep=" ", timespec="microseconds"),
+            ))
+            presentation_id += 1
+    return rows
+
+
+def generate(args):
+    out = os.path.abspath(args.out)
+    if os.path.exists(out):
+        if not args.force:
+            raise SystemExit(f"{out} zaten var (üzerine yazmak için --force)")
+        shutil.rmtree(out)
+    upload_dir = os.path.join(out, "presentations")
+    os.makedirs(upload_dir)
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    # Üretim sırasında dayanıklılık gerekmez; WAL ayarı geçişlerle birlikte kalıcı olur
+    db_engine = create_db_engine(
+        f"sqlite:///{os.path.join(out, 'balanceed.db')}",
+        pragmas={"journal_mode": "WAL", "synchronous": "OFF", "cache_size": -256000},
+    )
+    Base.metadata.create_all(bind=db_engine)
+
+    password_hash = bcrypt.hashpw(args.password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+    teachers, students = _users(args, password_hash)
+
+    moods = 0
+    with db_engine.begin() as conn:
+        _insert(conn, "INSERT INTO users (id, username, password, teacher_id, class_id) VALUES (?, ?, ?, ?, ?)", teachers + students)
+        _insert(
+            conn,
+            "INSERT INTO presentations (id, class_id, title, file_path, upload_timestamp, sha256, size_bytes, "
+            "processing_status, page_count, text_path, thumbnail_path, processed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _presentations(rng, args, upload_dir),
+        )
+
+    today = date.today()
+    for offset in range(args.days, 0, -1):
+        rows = _mood_rows(rng, students, today - timedelta(days=offset), args.fill)
+        with db_engine.begin() as conn:
+            _insert(conn, "INSERT INTO moods (user_id, class_id, score, mood, timestamp) VALUES (?, ?, ?, ?, ?)", rows)
+        moods += len(rows)
+
+    run_migrations(db_engine)
+    with db_engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    db_engine.dispose()
+
+    summary = {
+        "out": out,
+        "teachers": len(teachers),
+        "students": len(students),
+        "classes": args.teachers * args.classes,
+        "presentations": args.teachers * args.classes * args.presentations,
+        "moods": moods,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    with open(os.path.join(out, "dataset.json"), "w", encoding="utf-8") as f:
+        json.dump({**summary, "password": args.password, "seed": args.seed}, f, indent=2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.datagen")
+    parser.add_argument("--out", required=True, help="çıktı dizini")
+    parser.add_argument("--teachers", type=int, default=5)
+    parser.add_argument("--students", type=int, default=100, help="öğretmen başına öğrenci")
+    parser.add_argument("--classes", type=int, default=4, help="öğretmen başına sınıf")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--fill", type=float, default=0.9, help="bir öğrencinin bir gün test yapma olasılığı")
+    parser.add_argument("--presentations", type=int, default=10, help="sınıf başına sunum")
+    parser.add_argument("--password", default="benchpass")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args(argv)
+
+    summary = generate(args)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
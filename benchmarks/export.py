@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# Toplu dışa aktarım ölçümü: /export/class/{id} her biçimde (CSV, NDJSON, Parquet, Arrow).
+#
+#   python -m benchmarks.export
+#   python -m benchmarks.export --rows 2000000 --memory --json export.json
+#
+# Geçici bir veritabanına tek sınıf için --rows kayıt yazılır, uygulama süreç içinde
+# doğrudan ASGI üzerinden çağrılır (yanıt gövdesi sayılıp atılır, tamponlanmaz).
+# --memory ile tracemalloc tepe değeri de raporlanır: satır sayısı arttıkça
+# sabit kalmalıdır (ölçüm yavaşlar, süreleri ayrı çalıştırmada okuyun).
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import load_app
+
+MOODS = ("Yorgun", "Dalgın", "Normal", "Meraklı", "Enerjik")
+STUDENTS = 500
+CLASS_ID = 1
+
+
+def _fill(db_path, rows):
+    # Şema lifespan'da kurulur; veriler ORM'siz, doğrudan yazılır
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO users (id, username, password, teacher_id, class_id) VALUES (?, ?, '-', 1, ?)",
+        [(i, f"student_{i}", CLASS_ID) for i in range(1, STUDENTS + 1)],
+    )
+    start = datetime(2024, 1, 1, 8, 0)
+    batch = []
+    for i in range(rows):
+        batch.append((
+            i % STUDENTS + 1, CLASS_ID, random.randint(5, 25), random.choice(MOODS),
+            (start + timedelta(seconds=30 * i)).isoformat(sep=" "),
+        ))
+        if len(batch) == 50000:
+            conn.executemany("INSERT INTO moods (user_id, class_id, score, mood, timestamp) VALUES (?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO moods (user_id, class_id, score, mood, timestamp) VALUES (?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def _get(app, path):
+    # Tek istek; gövde parçaları sayılır, saklanmaz
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path.split("?")[0], "raw_path": path.split("?")[0].encode(),
+        "query_string": path.partition("?")[2].encode(), "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80), "root_path": "",
+    }
+    state = {"status": None, "bytes": 0, "chunks": 0}
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if not state.get("sent_request"):
+            state["sent_request"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            state["bytes"] += len(message.get("body", b""))
+            state["chunks"] += 1
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return state
+
+
+async def run(app, rows, formats, memory):
+    results = []
+    async with app.router.lifespan_context(app):
+        for fmt in formats:
+            if memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            state = await _get(app, f"/export/class/{CLASS_ID}?format={fmt}")
+            elapsed = time.perf_counter() - started
+            peak = None
+            if memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if state["status"] != 200:
+                print(f"{fmt:8} atlandı (HTTP {state['status']})")
+                continue
+            results.append({
+                "format": fmt,
+                "rows": rows,
+                "seconds": elapsed,
+                "rows_per_s": rows / elapsed,
+                "mb": state["bytes"] / 1e6,
+                "mb_per_s": state["bytes"] / 1e6 / elapsed,
+                "chunks": state["chunks"],
+                "peak_traced_mb": peak / 1e6 if peak is not None else None,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BalanceED toplu dışa aktarım ölçümü")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--formats", default="csv,ndjson,parquet,arrow")
+    parser.add_argument("--batch", type=int, default=5000, help="EXPORT_BATCH_SIZE")
+    parser.add_argument("--memory", action="store_true", help="tracemalloc tepe değerini ölç")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        app = load_app(db_path, os.path.join(tmp, "presentations"), EXPORT_BATCH_SIZE=args.batch, METRICS_ENABLED=0)
+
+        async def prepare():
+            async with app.router.lifespan_context(app):
+                pass
+
+        asyncio.run(prepare())
+        started = time.perf_counter()
+        _fill(db_path, args.rows)
+        print(f"{args.rows} kayıt {time.perf_counter() - started:.1f} sn'de yazıldı")
+
+        results = asyncio.run(run(app, args.rows, args.formats.split(","), args.memory))
+
+    for result in results:
+        peak = f"  tepe {result['peak_traced_mb']:6.1f} MB" if result["peak_traced_mb"] is not None else ""
+        print(
+            f"{result['format']:8} {result['seconds']:6.2f} sn  {result['rows_per_s']:9.0f} satır/sn  "
+            f"{result['mb']:7.1f} MB  {result['mb_per_s']:6.1f} MB/sn  {result['chunks']} parça{peak}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
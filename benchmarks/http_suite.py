@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+# Rota bazında gecikme / verim benchmark'ı (süreç içi ASGI istemcisi).
+#
+#   python -m benchmarks.datagen --out bench-data
+#   python -m benchmarks.http_suite --data bench-data --json current.json
+#   python -m benchmarks.http_suite --data bench-data --baseline current.json --fail-on-regression
+#
+# Uygulama httpx.ASGITransport üzerinden, ağ olmadan çağrılır. Her rota için
+# --requests istek --concurrency eşzamanlılıkla gönderilir; p50/p95/p99 gecikme,
+# verim (istek/s), yanıt boyutu ve durum kodları raporlanır. Yazan rotalar
+# (submit, register) veritabanını değiştirdiğinden varsayılan olarak veritabanının
+# geçici bir kopyası kullanılır (--in-place ile doğrudan).
+#
+# Kapsam dışı: /presentation/upload ve update-password (yan etkisi ağır),
+# /stream/class|teacher (uzun ömürlü SSE bağlantıları; yalnızca /stream/stats ölçülür).
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import load_app, percentile
+
+
+@dataclass
+class Context:
+    teachers: list
+    students: list  # (user_id, teacher_id, class_id)
+    classes: list
+    presentations: list  # (id, class_id, file_path)
+    password: str
+    token: str = ""
+
+
+@dataclass
+class Scenario:
+    route: str
+    build: Callable[[Context, random.Random], dict]
+    requests: Optional[int] = None  # --requests'ten küçükse bu kullanılır (ör. bcrypt)
+    expected: Tuple[int, ...] = (200,)
+
+
+def _student(ctx, rng):
+    return rng.choice(ctx.students)
+
+
+def _presentation(ctx, rng):
+    return rng.choice(ctx.presentations)
+
+
+def _answers(rng):
+    return [rng.randint(1, 5) for _ in range(5)]
+
+
+def _since(days):
+    return (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _auth(ctx):
+    return {"Authorization": f"Bearer {ctx.token}"}
+
+
+SCENARIOS = [
+    Scenario("GET /", lambda ctx, rng: {"method": "GET", "url": "/"}),
+    # auth
+    Scenario("POST /auth/login", lambda ctx, rng: {
+        "method": "POST", "url": "/auth/login",
+        "json": {"username": f"teacher_{rng.choice(ctx.teachers)}", "password": ctx.password},
+    }, requests=20),
+    Scenario("POST /auth/register", lambda ctx, rng: {
+        "method": "POST", "url": "/auth/register",
+        "json": {"username": f"bench_{rng.getrandbits(64):x}", "password": ctx.password, "teacher_id": rng.choice(ctx.teachers)},
+    }, requests=20),
+    Scenario("GET /auth/auth/user-info/{user_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/auth/auth/user-info/{_student(ctx, rng)[0]}",
+    }),
+    Scenario("GET /auth/teacher/{teacher_id}/students", lambda ctx, rng: {
+        "method": "GET", "url": f"/auth/teacher/{rng.choice(ctx.teachers)}/students", "headers": _auth(ctx),
+    }),
+    Scenario("GET /auth/class/{class_id}/students", lambda ctx, rng: {
+        "method": "GET", "url": f"/auth/class/{rng.choice(ctx.classes)}/students", "headers": _auth(ctx),
+    }),
+    # mood
+    Scenario("POST /mood/submit", lambda ctx, rng: {
+        "method": "POST", "url": "/mood/submit",
+        "json": (lambda s: {"user_id": s[0], "class_id": s[2], "answers": _answers(rng)})(_student(ctx, rng)),
+    }, expected=(200, 400)),
+    Scenario("POST /mood/submit/bulk", lambda ctx, rng: {
+        "method": "POST", "url": "/mood/submit/bulk",
+        "json": [
+            {"user_id": s[0], "class_id": s[2], "answers": _answers(rng)}
+            for s in rng.sample(ctx.students, min(100, len(ctx.students)))
+        ],
+    }, requests=20),
+    Scenario("GET /mood/class/{class_id}/summary", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/class/{rng.choice(ctx.classes)}/summary",
+    }),
+    Scenario("GET /mood/class/{class_id}/recommendation", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/class/{rng.choice(ctx.classes)}/recommendation",
+    }),
+    Scenario("GET /mood/class-summary/{class_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/class-summary/{rng.choice(ctx.classes)}",
+    }),
+    Scenario("GET /mood/history/{user_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/history/{_student(ctx, rng)[0]}",
+    }),
+    Scenario("GET /mood/mood-history/{user_id}/chart", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/mood-history/{_student(ctx, rng)[0]}/chart",
+    }),
+    Scenario("GET /mood/user/{user_id}/chart-data", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/user/{_student(ctx, rng)[0]}/chart-data",
+    }),
+    Scenario("GET /mood/user/{user_id}/chart-data?bucket=week", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/user/{_student(ctx, rng)[0]}/chart-data", "params": {"bucket": "week"},
+    }),
+    Scenario("GET /mood/teacher/{teacher_id}/student-latest-moods", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/teacher/{rng.choice(ctx.teachers)}/student-latest-moods",
+    }),
+    Scenario("GET /mood/teacher/{teacher_id}/student/{student_id}/history", lambda ctx, rng: {
+        "method": "GET", "url": (lambda s: f"/mood/teacher/{s[1]}/student/{s[0]}/history")(_student(ctx, rng)),
+    }),
+    Scenario("GET /mood/teacher/{teacher_id}/class-summary", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/teacher/{rng.choice(ctx.teachers)}/class-summary",
+    }),
+    Scenario("GET /mood/teacher/{teacher_id}/students-latest-moods", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/teacher/{rng.choice(ctx.teachers)}/students-latest-moods",
+    }),
+    Scenario("GET /mood/teacher/{teacher_id}/students-mood-chart-data?since=30d", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/teacher/{rng.choice(ctx.teachers)}/students-mood-chart-data",
+        "params": {"since": _since(30)},
+    }),
+    Scenario("GET /mood/teacher/{teacher_id}/students-mood-chart-data?bucket=week", lambda ctx, rng: {
+        "method": "GET", "url": f"/mood/teacher/{rng.choice(ctx.teachers)}/students-mood-chart-data",
+        "params": {"bucket": "week"},
+    }),
+    # chatbot
+    Scenario("GET /chatbot/{user_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/chatbot/{_student(ctx, rng)[0]}",
+    }),
+    Scenario("POST /chatbot/recommend", lambda ctx, rng: {
+        "method": "POST", "url": "/chatbot/recommend",
+        "json": (lambda s: {"user_id": s[0], "class_id": s[2]})(_student(ctx, rng)),
+    }),
+    Scenario("POST /chatbot/recommend/batch", lambda ctx, rng: {
+        "method": "POST", "url": "/chatbot/recommend/batch", "json": {"class_id": rng.choice(ctx.classes)},
+    }),
+    Scenario("GET /chatbot/cache/stats", lambda ctx, rng: {"method": "GET", "url": "/chatbot/cache/stats"}),
+    # presentation
+    Scenario("GET /presentation/search", lambda ctx, rng: {
+        "method": "GET", "url": "/presentation/search", "params": {"q": rng.choice(["matematik", "enerji türev", "osm"])},
+    }),
+    Scenario("GET /presentation/presentations/{class_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/presentations/{rng.choice(ctx.classes)}",
+    }),
+    Scenario("GET /presentation/class/{class_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/class/{rng.choice(ctx.classes)}",
+    }),
+    Scenario("GET /presentation/latest/{class_id}", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/latest/{rng.choice(ctx.classes)}",
+    }),
+    Scenario("GET /presentation/student/class/{class_id}/presentations", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/student/class/{rng.choice(ctx.classes)}/presentations",
+    }),
+    Scenario("GET /presentation/student/{class_id}/presentations", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/student/{rng.choice(ctx.classes)}/presentations",
+    }),
+    Scenario("GET /presentation/student/{student_id}/presentation/{presentation_id}/detail", lambda ctx, rng: {
+        "method": "GET",
+        "url": (lambda s: f"/presentation/student/{s[0]}/presentation/"
+                f"{rng.choice([p for p in ctx.presentations if p[1] == s[2]] or ctx.presentations)[0]}/detail")(_student(ctx, rng)),
+    }, expected=(200, 404)),
+    Scenario("GET /presentation/{presentation_id}/download", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/{_presentation(ctx, rng)[0]}/download",
+    }),
+    Scenario("GET /presentation/{presentation_id}/download (Range)", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/{_presentation(ctx, rng)[0]}/download", "headers": {"Range": "bytes=0-63"},
+    }, expected=(206,)),
+    Scenario("GET /presentation/{presentation_id}/thumbnail", lambda ctx, rng: {
+        "method": "GET", "url": f"/presentation/{_presentation(ctx, rng)[0]}/thumbnail",
+    }),
+    # files / stream / metrics
+    Scenario("GET /files/{file_path}", lambda ctx, rng: {
+        "method": "GET", "url": f"/files/{_presentation(ctx, rng)[2]}",
+    }),
+    Scenario("GET /stream/stats", lambda ctx, rng: {"method": "GET", "url": "/stream/stats"}),
+    Scenario("GET /metrics", lambda ctx, rng: {"method": "GET", "url": "/metrics"}),
+]
+
+
+def _load_context(password) -> Context:
+    from sqlalchemy import select
+
+    from app.db.database import SessionLocal
+    from app.models import presentation as presentation_model, user as user_model
+
+    User = user_model.User
+    Presentation = presentation_model.Presentation
+    with SessionLocal() as db:
+        teachers = db.scalars(select(User.id).where(User.teacher_id.is_(None))).all()
+        students = db.execute(
+            select(User.id, User.teacher_id, User.class_id).where(User.teacher_id.isnot(None), User.class_id.isnot(None))
+        ).all()
+        presentations = db.execute(select(Presentation.id, Presentation.class_id, Presentation.file_path)).all()
+    return Context(
+        teachers=list(teachers),
+        students=[tuple(row) for row in students],
+        classes=sorted({row[2] for row in students}),
+        presentations=[tuple(row) for row in presentations],
+        password=password,
+    )
+
+
+async def _run_scenario(client, scenario, ctx, args, rng):
+    total = min(args.requests, scenario.requests or args.requests)
+    latencies, sizes, statuses = [], [], {}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            request = scenario.build(ctx, rng)
+            started = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(response.content))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(args.concurrency, total))))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "route": scenario.route,
+        "requests": total,
+        "concurrency": min(args.concurrency, total),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies),
+        "throughput_rps": total / elapsed,
+        "mean_bytes": statistics.fmean(sizes),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "unexpected": sum(count for code, count in statuses.items() if code not in scenario.expected),
+    }
+
+
+async def run(args, app, ctx):
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    # ASGITransport lifespan olaylarını göndermez; açılış/kapanış burada çalıştırılır
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Öğretmen uç noktaları için bir kez giriş yapılır
+        login = await client.post("/auth/login", json={"username": f"teacher_{ctx.teachers[0]}", "password": ctx.password})
+        ctx.token = login.json().get("access_token", "")
+
+        results = []
+        for scenario in SCENARIOS:
+            if args.only and not any(part in scenario.route for part in args.only):
+                continue
+            # Isınma: bağlantı havuzu, önbellekler, SQLite sayfa önbelleği
+            for _ in range(args.warmup):
+                await client.request(**scenario.build(ctx, rng))
+            result = await _run_scenario(client, scenario, ctx, args, rng)
+            results.append(result)
+            _print(result)
+    return results
+
+
+def _print(result):
+    flag = f"  !! beklenmeyen={result['unexpected']}" if result["unexpected"] else ""
+    print(
+        f"{result['route'][:78]:78s} p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+        f"p99={result['p99_ms']:8.2f}ms {result['throughput_rps']:8.1f} istek/s {result['mean_bytes']:9.0f}B "
+        f"{result['statuses']}{flag}"
+    )
+
+
+def compare(results, baseline, threshold) -> int:
+    # p95 gecikmesi ya da verimi eşikten fazla kötüleşen rotaları listeler
+    previous: Dict[str, dict] = {row["route"]: row for row in baseline["results"]}
+    regressions = 0
+    print("\n== taban çizgisiyle karşılaştırma ==")
+    for row in results:
+        base = previous.get(row["route"])
+        if base is None:
+            print(f"{row['route'][:78]:78s} (yeni rota)")
+            continue
+        p95_ratio = row["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        rps_ratio = row["throughput_rps"] / base["throughput_rps"] if base["throughput_rps"] else 1.0
+        regressed = p95_ratio > 1 + threshold or rps_ratio < 1 - threshold
+        regressions += regressed
+        print(
+            f"{row['route'][:78]:78s} p95 {base['p95_ms']:8.2f} -> {row['p95_ms']:8.2f}ms ({p95_ratio:5.2f}x)  "
+            f"verim {rps_ratio:5.2f}x{'  GERİLEME' if regressed else ''}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.http_suite")
+    parser.add_argument("--data", required=True, help="benchmarks.datagen çıktı dizini")
+    parser.add_argument("--requests", type=int, default=200, help="rota başına istek")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="yalnızca rota adında bu parçaları içerenler")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--in-place", action="store_true", help="veritabanını kopyalamadan kullan")
+    parser.add_argument("--json", dest="json_path", help="sonuçları bu dosyaya JSON olarak yaz")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki JSON sonucu")
+    parser.add_argument("--threshold", type=float, default=0.2, help="gerileme eşiği (0.2 = %%20)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    data = os.path.abspath(args.data)
+    with open(os.path.join(data, "dataset.json"), encoding="utf-8") as f:
+        dataset = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(data, "balanceed.db")
+        if not args.in_place:
+            shutil.copyfile(db_path, os.path.join(tmp, "balanceed.db"))
+            db_path = os.path.join(tmp, "balanceed.db")
+
+        app = load_app(db_path, os.path.join(data, "presentations"))
+        ctx = _load_context(dataset["password"])
+        results = asyncio.run(run(args, app, ctx))
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "dataset": {key: dataset[key] for key in ("teachers", "students", "classes", "presentations", "moods")},
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
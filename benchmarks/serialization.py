@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+# JSON serileştirme maliyeti: 10 bin kayıt başına milisaniye, önce / sonra.
+#
+#   python -m benchmarks.serialization
+#   python -m benchmarks.serialization --entries 50000 --json ser.json
+#
+# "önce": dict listesi -> jsonable_encoder -> JSONResponse (json.dumps); tipli
+# yanıt modeli olmayan rotalarda FastAPI'nin izlediği yol.
+# "sonra": yanıt modeliyle doğrulama + JSON moduna dökme -> FastJSONResponse
+# (orjson); tipli rotalarda izlenen yol. "sonra (json)" aynı yolun orjson
+# kurulu değilken standart json ile çalışan hâlidir.
+# Veritabanı ve HTTP katmanı dahil değildir; uçtan uca ölçüm için http_suite.
+
+import argparse
+import json
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core import responses
+from app.routers.mood import MoodHistoryPage, StudentChartSeries, StudentLatestMood
+
+MOODS = ("Yorgun", "Dalgın", "Normal", "Meraklı", "Enerjik")
+
+Row = namedtuple("Row", "id username timestamp score mood")
+
+
+def _rows(count):
+    # Veritabanından gelen sütun demetlerinin yerine geçer
+    start = datetime(2024, 1, 1, 8, 0)
+    return [
+        Row(
+            i,
+            f"ogrenci{i % 500}",
+            start + timedelta(minutes=37 * i, microseconds=i),
+            random.randint(5, 25),
+            random.choice(MOODS),
+        )
+        for i in range(count)
+    ]
+
+
+# Her senaryo: (ad, yanıt modeli, eski gövde üretimi, yeni gövde üretimi)
+def _history(rows):
+    return {
+        "items": [{"timestamp": r.timestamp.isoformat(), "score": r.score, "mood": r.mood} for r in rows],
+        "next_cursor": None,
+    }
+
+
+def _history_typed(rows):
+    return {
+        "items": [{"timestamp": r.timestamp, "score": r.score, "mood": r.mood} for r in rows],
+        "next_cursor": None,
+    }
+
+
+def _latest(rows):
+    return [
+        {"student_id": r.id, "username": r.username, "score": r.score, "mood": r.mood, "timestamp": r.timestamp}
+        for r in rows
+    ]
+
+
+def _chart(rows, per_student=100):
+    # 100 günlük seriler; toplam nokta sayısı kayıt sayısına eşit
+    return [
+        {
+            "student_id": offset,
+            "username": rows[offset].username,
+            "labels": [r.timestamp.strftime("%Y-%m-%d") for r in rows[offset:offset + per_student]],
+            "scores": [r.score for r in rows[offset:offset + per_student]],
+        }
+        for offset in range(0, len(rows), per_student)
+    ]
+
+
+SCENARIOS = [
+    ("ruh hali geçmişi", MoodHistoryPage, _history, _history_typed),
+    ("öğrencilerin son ruh halleri", List[StudentLatestMood], _latest, _latest),
+    ("öğretmen grafik verisi", List[StudentChartSeries], _chart, _chart),
+]
+
+
+def _best(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def run(entries, repeat):
+    rows = _rows(entries)
+    scale = 10000 / entries
+    results = []
+    for name, model, build_before, build_after in SCENARIOS:
+        adapter = TypeAdapter(model)
+
+        def before():
+            return JSONResponse(jsonable_encoder(build_before(rows))).body
+
+        def after():
+            return responses.FastJSONResponse(adapter.dump_python(adapter.validate_python(build_after(rows)), mode="json")).body
+
+        before_s, before_body = _best(before, repeat)
+        after_s, after_body = _best(after, repeat)
+        assert json.loads(before_body) == json.loads(after_body), name
+
+        fallback_s = None
+        if responses.orjson is not None:
+            saved, responses.orjson = responses.orjson, None
+            try:
+                fallback_s, _ = _best(after, repeat)
+            finally:
+                responses.orjson = saved
+
+        results.append({
+            "scenario": name,
+            "entries": entries,
+            "bytes": len(after_body),
+            "before_ms_per_10k": before_s * 1000 * scale,
+            "after_ms_per_10k": after_s * 1000 * scale,
+            "after_stdlib_json_ms_per_10k": fallback_s * 1000 * scale if fallback_s is not None else None,
+            "speedup": before_s / after_s,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BalanceED JSON serileştirme kıyası")
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya yaz")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = run(args.entries, args.repeat)
+    for result in results:
+        fallback = result["after_stdlib_json_ms_per_10k"]
+        print(
+            f"{result['scenario']:30} önce {result['before_ms_per_10k']:7.1f} ms/10k  "
+            f"sonra {result['after_ms_per_10k']:6.1f} ms/10k  "
+            + (f"sonra (json) {fallback:6.1f} ms/10k  " if fallback is not None else "")
+            + f"x{result['speedup']:.1f}  {result['bytes']} B"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
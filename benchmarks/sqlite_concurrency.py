@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# SQLite eşzamanlılık stres testi: yazma patlamaları sırasında okuma gecikmesini ölçer.
+#
+#   python -m benchmarks.sqlite_concurrency                 # ayarlı profil (WAL + PRAGMA'lar)
+#   python -m benchmarks.sqlite_concurrency --profile both  # varsayılan SQLite ile karşılaştır
+#
+# Her profil için geçici bir veritabanı kurulur. Önce yalnızca okuyucular çalışır
+# (taban çizgisi), ardından okuyuculara yazma patlamaları yapan thread'ler eklenir.
+# Okuma gecikmesi yüzdelikleri ve "database is locked" hataları raporlanır.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.db.database import Base, create_db_engine
+from app.models import mood as mood_model, mood_rollup, presentation, user  # noqa: F401
+from benchmarks.common import percentile
+
+MOODS = ["Yorgun", "Dalgın", "Normal", "Meraklı", "Enerjik"]
+
+
+def _seed(db_engine, users, rows):
+    now = datetime.utcnow()
+    data = [
+        {
+            "user_id": random.randint(1, users),
+            "class_id": random.randint(1, 10),
+            "score": random.randint(5, 25),
+            "mood": random.choice(MOODS),
+            "timestamp": now - timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+    with db_engine.begin() as conn:
+        conn.execute(mood_model.MoodEntry.__table__.insert(), data)
+
+
+def _reader(db_engine, users, stop, latencies, errors):
+    MoodEntry = mood_model.MoodEntry
+    while not stop.is_set():
+        stmt = (
+            select(MoodEntry.score, MoodEntry.mood, MoodEntry.timestamp)
+            .where(MoodEntry.user_id == random.randint(1, users))
+            .order_by(MoodEntry.timestamp.desc())
+            .limit(50)
+        )
+        started = time.perf_counter()
+        try:
+            with db_engine.connect() as conn:
+                conn.execute(stmt).all()
+        except OperationalError:
+            errors.append("read")
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+def _writer(db_engine, users, burst, stop, errors, written):
+    table = mood_model.MoodEntry.__table__
+    while not stop.is_set():
+        rows = [
+            {
+                "user_id": random.randint(1, users),
+                "class_id": random.randint(1, 10),
+                "score": random.randint(5, 25),
+                "mood": random.choice(MOODS),
+                "timestamp": datetime.utcnow(),
+            }
+            for _ in range(burst)
+        ]
+        try:
+            with db_engine.begin() as conn:
+                # Satırları tek tek yazarak yazma kilidini gerçekçi bir süre tut
+                for row in rows:
+                    conn.execute(table.insert(), row)
+            written.append(burst)
+        except OperationalError:
+            errors.append("write")
+        time.sleep(0.005)
+
+
+def _phase(db_engine, args, writers):
+    stop = threading.Event()
+    latencies, errors, written = [], [], []
+    threads = [
+        threading.Thread(target=_reader, args=(db_engine, args.users, stop, latencies, errors))
+        for _ in range(args.readers)
+    ]
+    threads += [
+        threading.Thread(target=_writer, args=(db_engine, args.users, args.burst, stop, errors, written))
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "reads": len(latencies),
+        "read_p50_ms": percentile(latencies, 50),
+        "read_p95_ms": percentile(latencies, 95),
+        "read_p99_ms": percentile(latencies, 99),
+        "read_mean_ms": statistics.fmean(latencies) if latencies else None,
+        "rows_written": sum(written),
+        "read_lock_errors": errors.count("read"),
+        "write_lock_errors": errors.count("write"),
+    }
+
+
+def run_profile(name, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'stress.db')}"
+        # "default": uygulamanın eski ayarları (PRAGMA yok, rollback journal)
+        db_engine = create_db_engine(url, pragmas={} if name == "default" else None)
+        Base.metadata.create_all(bind=db_engine)
+        _seed(db_engine, args.users, args.rows)
+
+        result = {
+            "profile": name,
+            "idle": _phase(db_engine, args, writers=0),
+            "write_burst": _phase(db_engine, args, writers=args.writers),
+        }
+        db_engine.dispose()
+    return result
+
+
+def _print(result):
+    print(f"\n== {result['profile']} ==")
+    for phase in ("idle", "write_burst"):
+        r = result[phase]
+        print(
+            f"{phase:12s} reads={r['reads']:7d}  p50={r['read_p50_ms']:.2f}ms  "
+            f"p95={r['read_p95_ms']:.2f}ms  p99={r['read_p99_ms']:.2f}ms  "
+            f"written={r['rows_written']:6d}  locked(read/write)={r['read_lock_errors']}/{r['write_lock_errors']}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_concurrency")
+    parser.add_argument("--profile", choices=["tuned", "default", "both"], default="tuned")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--burst", type=int, default=200, help="yazma transaction'ı başına satır")
+    parser.add_argument("--duration", type=float, default=5.0, help="faz başına saniye")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=50000, help="başlangıç moods satırı")
+    parser.add_argument("--json", dest="json_path", help="sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args(argv)
+
+    profiles = ["default", "tuned"] if args.profile == "both" else [args.profile]
+    results = [run_profile(name, args) for name in profiles]
+    for result in results:
+        _print(result)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()